@@ -0,0 +1,70 @@
+"""Measure how many crops per second DetectionClassSimilarity embeds, for different backbones and precisions.
+
+Example:
+    python scripts/benchmark_class_similarity.py --backbones swin_v2_b resnet18 --precisions float32 bfloat16
+"""
+import time
+import argparse
+
+import numpy as np
+
+from data_gradients.feature_extractors import DetectionClassSimilarity
+from data_gradients.utils.data_classes.data_samples import DetectionSample, Image
+from data_gradients.utils.data_classes.image_channels import ImageChannels
+from data_gradients.dataset_adapters.formatters.utils import Uint8ImageFormat
+
+
+def generate_samples(num_samples: int, boxes_per_sample: int):
+    rng = np.random.default_rng(seed=0)
+    samples = []
+    for i in range(num_samples):
+        bboxes_xyxy = rng.integers(0, 400, size=(boxes_per_sample, 4))
+        bboxes_xyxy[:, 2:] = bboxes_xyxy[:, :2] + rng.integers(32, 200, size=(boxes_per_sample, 2))
+        samples.append(
+            DetectionSample(
+                sample_id=str(i),
+                split="train",
+                image=Image(data=rng.integers(0, 255, size=(640, 640, 3), dtype=np.uint8), format=Uint8ImageFormat(), channels=ImageChannels.from_str("RGB")),
+                bboxes_xyxy=bboxes_xyxy,
+                class_ids=rng.integers(0, 10, size=boxes_per_sample),
+                class_names={i: f"class_{i}" for i in range(10)},
+            )
+        )
+    return samples
+
+
+def benchmark(samples, **kwargs) -> float:
+    extractor = DetectionClassSimilarity(iou_threshold=None, **kwargs)
+    extractor.embedder.model  # Instantiate the backbone before starting the timer.
+
+    start = time.perf_counter()
+    for sample in samples:
+        extractor.update(sample)
+    extractor.state_dict()  # Embed the last, incomplete, batch.
+    elapsed = time.perf_counter() - start
+    return int(extractor.class_instances_count.sum()) / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backbones", nargs="+", default=["swin_v2_b", "resnet18", "mobilenet_v3_small"])
+    parser.add_argument("--precisions", nargs="+", default=["float32", "bfloat16"])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--num-samples", type=int, default=20)
+    parser.add_argument("--boxes-per-sample", type=int, default=16)
+    parser.add_argument("--random-weights", action="store_true", help="Do not download the pretrained weights. Speed does not depend on them.")
+    args = parser.parse_args()
+
+    samples = generate_samples(num_samples=args.num_samples, boxes_per_sample=args.boxes_per_sample)
+    for backbone in args.backbones:
+        for precision in args.precisions:
+            crops_per_sec = benchmark(
+                samples,
+                backbone=backbone,
+                weights=None if args.random_weights else "DEFAULT",
+                batch_size=args.batch_size,
+                precision=precision,
+                device=args.device,
+            )
+            print(f"{backbone:<25} {precision:<10} {crops_per_sec:8.1f} crops/sec")
@@ -24,14 +24,14 @@ from data_gradients.feature_extractors import (
 )
 
 
-def _get_all_report_features(train_image_dir: str, valid_image_dir: str):
-    """Features defined manually in order to dynamically define `ImageDuplicates(train_image_dir=..., valid_image_dir=...)`"""
+def _get_all_report_features():
+    """Features defined manually in order to include `ImageDuplicates`, which is not part of the default features."""
     features = [
         SummaryStats(),
         ImagesResolution(),
         ImageColorDistribution(),
         ImagesAverageBrightness(),
-        ImageDuplicates(train_image_dir=train_image_dir, valid_image_dir=valid_image_dir),
+        ImageDuplicates(),
         DetectionSampleVisualization(n_rows=3, n_cols=4, stack_splits_vertically=True),
         DetectionClassHeatmap(n_rows=6, n_cols=2, heatmap_shape=(200, 200)),
         DetectionBoundingBoxArea(topk=30, prioritization_mode="train_val_diff"),
@@ -50,10 +50,9 @@ if __name__ == "__main__":
         root_dir="/data/coco",
         year=2017,
         report_title="COCO",
-        feature_extractors=_get_all_report_features(train_image_dir="/data/coco/images/train2017/", valid_image_dir="/data/coco/images/val2017/"),
+        feature_extractors=_get_all_report_features(),
     )
 
-    # VOC dataset does not clearly split the train/valid sets so we cannot run duplicate analysis
     DetectionAnalysisManager.analyze_voc(root_dir="/data/voc/VOCdevkit", year=2012, report_title="VOC")
 
     # Running on all the Roboflow100 datasets
@@ -62,7 +61,7 @@ if __name__ == "__main__":
 
         DetectionAnalysisManager.analyze_coco_format(
             root_dir=dataset_path,
-            feature_extractors=_get_all_report_features(train_image_dir=f"{dataset_path}/train/", valid_image_dir=f"{dataset_path}/valid/"),
+            feature_extractors=_get_all_report_features(),
             train_images_subdir="train",
             train_annotation_file_path="train/_annotations.coco.json",
             val_images_subdir="valid",
@@ -24,14 +24,14 @@ from data_gradients.feature_extractors import (
 )
 
 
-def _get_all_report_features(train_image_dir: str, valid_image_dir: str):
-    """Features defined manually in order to dynamically define `ImageDuplicates(train_image_dir=..., valid_image_dir=...)`"""
+def _get_all_report_features():
+    """Features defined manually in order to include `ImageDuplicates`, which is not part of the default features."""
     features = [
         SummaryStats(),
         ImagesResolution(),
         ImageColorDistribution(),
         ImagesAverageBrightness(),
-        ImageDuplicates(train_image_dir=train_image_dir, valid_image_dir=valid_image_dir),
+        ImageDuplicates(),
         SegmentationSampleVisualization(n_rows=3, n_cols=3, stack_splits_vertically=True, stack_mask_vertically=True),
         SegmentationClassHeatmap(n_rows=6, n_cols=2, heatmap_shape=(200, 200)),
         SegmentationClassFrequency(topk=30, prioritization_mode="train_val_diff"),
@@ -50,17 +50,15 @@ if __name__ == "__main__":
         root_dir="/data/coco",
         year=2017,
         report_title="SEG COCO",
-        feature_extractors=_get_all_report_features(train_image_dir="/data/coco/images/train2017/", valid_image_dir="/data/coco/images/val2017/"),
+        feature_extractors=_get_all_report_features(),
     )
 
-    # VOC dataset does not clearly split the train/valid sets so we cannot run duplicate analysis
     SegmentationAnalysisManager.analyze_voc(
         root_dir="/data/voc/VOCdevkit",
         year=2012,
         report_title="SEG VOC",
     )
 
-    # Cityscape does not support image duplicate out of the box because it is made of multiple image sets
     trainset = cityscapes_train()
     val_set = cityscapes_val()
     SegmentationAnalysisManager(
@@ -68,5 +66,5 @@ if __name__ == "__main__":
         val_data=val_set,
         report_title="SEG Cityspace",
         class_names=trainset.dataset.classes + ["Ignore"],
-        feature_extractors=_get_all_report_features(train_image_dir="/data/coco/images/train2017/", valid_image_dir="/data/coco/images/val2017/"),
+        feature_extractors=_get_all_report_features(),
     ).run()
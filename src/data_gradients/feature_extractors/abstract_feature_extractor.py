@@ -1,6 +1,7 @@
+import copy
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Union, Optional, Iterable
+from typing import Union, Optional, Iterable, Dict, Any
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -26,6 +27,10 @@ class Feature:
 
 
 class AbstractFeatureExtractor(ABC):
+    # Whether `update` can run in a worker thread, concurrently with the other feature extractors.
+    # Set it to False if `update` relies on state that is shared outside the feature extractor, the extractor will then be updated in the main thread.
+    thread_safe: bool = True
+
     @abstractmethod
     def update(self, sample: ImageSample):
         """Accumulate information about samples"""
@@ -35,6 +40,50 @@ class AbstractFeatureExtractor(ABC):
     def aggregate(self) -> Feature:
         raise NotImplementedError()
 
+    def state_dict(self) -> Dict[str, Any]:
+        """Return the state accumulated by `update`. This is everything `aggregate` needs, but not the configuration of the feature extractor.
+        The state should be picklable, so that it can be sent between processes or saved to disk.
+
+        By default, the state is what is accumulated in `self.data`; either a list of records or a `ColumnarAccumulator`.
+        Override if the feature extractor accumulates anything else.
+        """
+        return {"data": self.data}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        """Replace the current state of the feature extractor by the given state, as returned by `state_dict`."""
+        self.data = copy.deepcopy(state_dict["data"])
+
+    def merge(self, other: "AbstractFeatureExtractor") -> "AbstractFeatureExtractor":
+        """Merge the state accumulated by another instance of the same feature extractor (e.g. that processed another shard of the dataset).
+        After merging, `aggregate` returns the same result as if a single feature extractor had seen the samples of both.
+
+        :param other:   Feature extractor of the same type, and with the same configuration.
+        :return:        The feature extractor itself, to allow chaining.
+        """
+        self._check_can_merge(other)
+        other_data = other.state_dict()["data"]
+        if isinstance(self.data, list):
+            self.data.extend(other_data)
+        else:
+            self.data.merge(other_data)
+        return self
+
+    @classmethod
+    def from_state(cls, state_dict: Dict[str, Any], **kwargs) -> "AbstractFeatureExtractor":
+        """Instantiate a feature extractor and load a state into it.
+
+        :param state_dict:  State, as returned by `state_dict`.
+        :param kwargs:      Parameters used to instantiate the feature extractor. Should be the same as the ones used to build the state.
+        :return:            Feature extractor with the given state.
+        """
+        feature_extractor = cls(**kwargs)
+        feature_extractor.load_state_dict(state_dict)
+        return feature_extractor
+
+    def _check_can_merge(self, other: "AbstractFeatureExtractor"):
+        if type(other) is not type(self):
+            raise TypeError(f"Cannot merge {type(other).__name__} into {type(self).__name__}.")
+
     def setup_data_sources(self, tran_data: Iterable, val_data: Iterable):
         """
         Called in AnalysisManagerAbstract.__init__ for the purpose of exposing tran_data and val_data
@@ -0,0 +1,187 @@
+from typing import Dict, Union, Any, Hashable, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+CATEGORY = "category"  # Column type for values taken from a small set (split, class name, ...). Stored as integer codes.
+
+
+class GrowableArray:
+    """Typed numpy array that can be appended to, with amortized O(1) insertion (capacity is doubled when full)."""
+
+    def __init__(self, dtype: Union[str, np.dtype], initial_capacity: int = 1024):
+        self.dtype = np.dtype(dtype)
+        self._buffer = np.empty(initial_capacity, dtype=self.dtype)
+        self._size = 0
+
+    def append(self, value: Any):
+        self._reserve(self._size + 1)
+        self._buffer[self._size] = value
+        self._size += 1
+
+    def extend(self, values: Union[np.ndarray, Iterable]):
+        values = np.asarray(values, dtype=self.dtype).reshape(-1)
+        self._reserve(self._size + len(values))
+        self._buffer[self._size : self._size + len(values)] = values
+        self._size += len(values)
+
+    @property
+    def values(self) -> np.ndarray:
+        """View over the values added so far. Copy it if you need to keep it after appending new values."""
+        return self._buffer[: self._size]
+
+    def _reserve(self, capacity: int):
+        if capacity > len(self._buffer):
+            new_buffer = np.empty(max(capacity, 2 * len(self._buffer)), dtype=self.dtype)
+            new_buffer[: self._size] = self.values
+            self._buffer = new_buffer
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only the used part of the buffer is pickled.
+        return {"dtype": self.dtype, "values": self.values.copy()}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.dtype = state["dtype"]
+        self._buffer = state["values"]
+        self._size = len(self._buffer)
+
+
+class CategoricalEncoder:
+    """Map hashable values (e.g. split names, class names) to consecutive integer codes, in order of appearance."""
+
+    def __init__(self):
+        self.categories: List[Hashable] = []
+        self._codes: Dict[Hashable, int] = {}
+
+    def encode(self, value: Hashable) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.categories)
+            self.categories.append(value)
+        return code
+
+    def encode_many(self, values: Iterable[Hashable]) -> np.ndarray:
+        return np.array([self.encode(value) for value in values], dtype=np.int32)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        categories = np.empty(len(self.categories), dtype=object)
+        categories[:] = self.categories
+        return categories[codes]
+
+
+class ColumnarAccumulator:
+    """Accumulate records in typed numpy columns instead of a list of dicts.
+
+    A list of dicts costs hundreds of bytes per record, while each column here costs its dtype size (e.g. 4 bytes for a float32, or for a category).
+
+    >>> accumulator = ColumnarAccumulator(columns={"split": CATEGORY, "class_id": np.int32, "area": np.float32})
+    >>> accumulator.append(split="train", class_id=1, area=10.5)
+    >>> accumulator.extend(split="val", class_id=np.array([2, 3]), area=np.array([3.0, 4.0]))
+    >>> accumulator.to_dataframe()  # split/class_id/area columns with 3 rows
+    """
+
+    def __init__(self, columns: Dict[str, Union[str, np.dtype, type]]):
+        """
+        :param columns: Mapping of column name to dtype. Use `CATEGORY` for columns with few unique values, such as split or class names.
+        """
+        self.encoders: Dict[str, CategoricalEncoder] = {name: CategoricalEncoder() for name, dtype in columns.items() if dtype == CATEGORY}
+        self.columns: Dict[str, GrowableArray] = {
+            name: GrowableArray(dtype=np.int32 if dtype == CATEGORY else dtype, initial_capacity=256) for name, dtype in columns.items()
+        }
+
+    def append(self, **row: Any):
+        """Add a single record. Every column should be provided."""
+        self._check_columns(row)
+        for name, value in row.items():
+            if name in self.encoders:
+                value = self.encoders[name].encode(value)
+            self.columns[name].append(value)
+
+    def extend(self, **columns: Any):
+        """Add multiple records at once. Every column should be provided, either as a sequence or as a scalar shared by all the records."""
+        self._check_columns(columns)
+        n_records = max((len(value) for value in columns.values() if np.ndim(value) > 0), default=1)
+        for name, values in columns.items():
+            is_scalar = np.ndim(values) == 0
+            if name in self.encoders:
+                values = self.encoders[name].encode(values) if is_scalar else self.encoders[name].encode_many(values)
+            self.columns[name].extend(np.full(n_records, values) if is_scalar else values)
+
+    def merge(self, other: "ColumnarAccumulator") -> "ColumnarAccumulator":
+        """Add all the records of another accumulator (with the same columns) after the records of this one."""
+        if set(other.columns) != set(self.columns):
+            raise ValueError(f"Cannot merge accumulators with different columns: {sorted(self.columns)} vs {sorted(other.columns)}")
+        self.extend(**other.to_dict())
+        return self
+
+    def to_dict(self) -> Dict[str, np.ndarray]:
+        """Return the columns as a dictionary of arrays, with the categorical columns decoded to their original values."""
+        return {
+            name: self.encoders[name].decode(column.values) if name in self.encoders else column.values.copy() for name, column in self.columns.items()
+        }
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.to_dict())
+
+    def _check_columns(self, values: Dict[str, Any]):
+        if set(values) != set(self.columns):
+            raise ValueError(f"Expected columns {sorted(self.columns)}, got {sorted(values)}")
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+
+class HistogramAccumulator:
+    """Count values into fixed bins, separately for each group (e.g. per split). Memory is proportional to the number of bins, not of values.
+
+    If `bin_edges` is not set, values are expected to be non-negative integers (e.g. class ids) and each value has its own bin.
+    The number of bins then grows with the largest value seen.
+    """
+
+    def __init__(self, bin_edges: Optional[np.ndarray] = None):
+        """
+        :param bin_edges:   Monotonically increasing edges of the bins. Values outside of [bin_edges[0], bin_edges[-1]] are counted in the first/last bin.
+        """
+        self.bin_edges = None if bin_edges is None else np.asarray(bin_edges, dtype=np.float64)
+        self.counts_per_group: Dict[Hashable, np.ndarray] = {}
+
+    @property
+    def n_bins(self) -> Optional[int]:
+        return None if self.bin_edges is None else len(self.bin_edges) - 1
+
+    def add(self, group: Hashable, values: Union[np.ndarray, Iterable]):
+        values = np.asarray(values).reshape(-1)
+        if self.bin_edges is None:
+            counts = np.bincount(values.astype(np.int64))
+        else:
+            bin_ids = np.clip(np.searchsorted(self.bin_edges, values, side="right") - 1, 0, self.n_bins - 1)
+            counts = np.bincount(bin_ids, minlength=self.n_bins)
+        self._add_counts(group, counts.astype(np.int64))
+
+    def counts(self, group: Hashable) -> np.ndarray:
+        """Counts of the given group. Empty if the group was never seen."""
+        return self.counts_per_group.get(group, np.zeros(self.n_bins or 0, dtype=np.int64))
+
+    @property
+    def groups(self) -> List[Hashable]:
+        return list(self.counts_per_group.keys())
+
+    def merge(self, other: "HistogramAccumulator") -> "HistogramAccumulator":
+        if (self.bin_edges is None) != (other.bin_edges is None) or (self.bin_edges is not None and not np.array_equal(self.bin_edges, other.bin_edges)):
+            raise ValueError("Cannot merge histograms with different bins.")
+        for group, counts in other.counts_per_group.items():
+            self._add_counts(group, counts)
+        return self
+
+    def _add_counts(self, group: Hashable, counts: np.ndarray):
+        current = self.counts_per_group.get(group)
+        if current is None:
+            self.counts_per_group[group] = counts.copy()
+            return
+        if len(current) < len(counts):
+            current = np.concatenate([current, np.zeros(len(counts) - len(current), dtype=current.dtype)])
+        current[: len(counts)] += counts
+        self.counts_per_group[group] = current
@@ -1,5 +1,5 @@
 import dataclasses
-from typing import List
+from typing import List, Dict, Any
 
 import numpy as np
 from jinja2 import Template
@@ -8,6 +8,7 @@ from data_gradients.assets import assets
 from data_gradients.common.registry.registry import register_feature_extractor
 from data_gradients.feature_extractors import AbstractFeatureExtractor
 from data_gradients.feature_extractors.abstract_feature_extractor import Feature
+from data_gradients.feature_extractors.common.summary import merge_basic_statistics
 from data_gradients.utils.data_classes.data_samples import ClassificationSample
 
 
@@ -48,6 +49,18 @@ class ClassificationSummaryStats(AbstractFeatureExtractor):
         basic_stats.classes_count = len(sample.class_names)
         basic_stats.classes.append(sample.class_id)
 
+    def state_dict(self) -> Dict[str, Any]:
+        return {"stats": self.stats}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        self.stats = {split: dataclasses.replace(basic_stats) for split, basic_stats in state_dict["stats"].items()}
+
+    def merge(self, other: "ClassificationSummaryStats") -> "ClassificationSummaryStats":
+        self._check_can_merge(other)
+        for split, other_basic_stats in other.state_dict()["stats"].items():
+            self.stats[split] = merge_basic_statistics(self.stats.get(split, ClassificationBasicStatistics()), other_basic_stats)
+        return self
+
     def aggregate(self) -> Feature:
         for basic_stats in self.stats.values():
             if basic_stats.num_samples > 0:
@@ -1,4 +1,4 @@
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Any
 import numpy as np
 from collections import defaultdict
 from abc import ABC, abstractmethod
@@ -27,15 +27,47 @@ class BaseClassHeatmap(AbstractFeatureExtractor, ABC):
     def update(self, sample: SegmentationSample):
         ...
 
+    def state_dict(self) -> Dict[str, Any]:
+        return {"class_names": self.class_names, "heatmaps_per_split": self.heatmaps_per_split}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        self.class_names = dict(state_dict["class_names"])
+        self.heatmaps_per_split = {split: heatmap.copy() for split, heatmap in state_dict["heatmaps_per_split"].items()}
+
+    def merge(self, other: "BaseClassHeatmap") -> "BaseClassHeatmap":
+        self._check_can_merge(other)
+        other_state = other.state_dict()
+        if not self.class_names:
+            self.class_names = dict(other_state["class_names"])
+        for split, other_heatmap in other_state["heatmaps_per_split"].items():
+            if split not in self.heatmaps_per_split:
+                self.heatmaps_per_split[split] = other_heatmap.copy()
+                continue
+            heatmap = self.heatmaps_per_split[split]
+            if len(heatmap) < len(other_heatmap):  # Heatmaps are allocated according to the class ids seen so far
+                heatmap = np.concatenate([heatmap, np.zeros((len(other_heatmap) - len(heatmap), *heatmap.shape[1:]), dtype=heatmap.dtype)])
+            heatmap[: len(other_heatmap)] += other_heatmap
+            self.heatmaps_per_split[split] = heatmap
+        return self
+
+    def get_heatmaps_per_split(self) -> Dict[str, Dict[int, np.ndarray]]:
+        """Heatmap of each class, per split. Each heatmap is of shape (heatmap_shape[0], heatmap_shape[1])."""
+        return {split: dict(enumerate(heatmaps)) for split, heatmaps in self.heatmaps_per_split.items()}
+
     def aggregate(self) -> Feature:
+        heatmaps_per_split = self.get_heatmaps_per_split()
+
         # Select top k heatmaps by appearance
-        split_count = sum(split_heatmap.sum(axis=(1, 2)) for split_heatmap in self.heatmaps_per_split.values())
-        most_used_class_ids = (-split_count).argsort()[: self.n_rows * self.n_cols]
+        class_counts = defaultdict(float)
+        for heatmaps in heatmaps_per_split.values():
+            for class_id, heatmap in heatmaps.items():
+                class_counts[class_id] += heatmap.sum()
+        most_used_class_ids = set(sorted(class_counts, key=lambda class_id: -class_counts[class_id])[: self.n_rows * self.n_cols])
 
         # Normalize (0-1)
         normalized_heatmaps_per_split_per_cls = defaultdict(dict)
-        for split, heatmaps in self.heatmaps_per_split.items():
-            for class_id, heatmap in enumerate(heatmaps):
+        for split, heatmaps in heatmaps_per_split.items():
+            for class_id, heatmap in heatmaps.items():
                 if class_id in most_used_class_ids:
                     class_name = self.class_names[class_id]
                     normalized_heatmaps_per_split_per_cls[class_name][split] = (255 * (heatmap / (heatmap.max() + 1e-6))).astype(np.uint8)
@@ -1,7 +1,9 @@
+import numpy as np
 import pandas as pd
 
 from data_gradients.common.registry.registry import register_feature_extractor
 from data_gradients.feature_extractors.abstract_feature_extractor import AbstractFeatureExtractor
+from data_gradients.feature_extractors.accumulators import ColumnarAccumulator, CATEGORY
 from data_gradients.utils.data_classes.data_samples import ImageSample
 from data_gradients.visualize.plot_options import KDEPlotOptions
 from data_gradients.visualize.plot_options import BarPlotOptions
@@ -20,13 +22,13 @@ class ImagesAverageBrightness(AbstractFeatureExtractor):
 
     def __init__(self):
         self.image_channels = None
-        self.data = []
+        self.data = ColumnarAccumulator(columns={"split": CATEGORY, "brightness": np.float64})
 
     def update(self, sample: ImageSample):
-        self.data.append({"split": sample.split, "brightness": sample.image.mean_intensity})
+        self.data.append(split=sample.split, brightness=sample.image.mean_intensity)
 
     def aggregate(self) -> Feature:
-        df = pd.DataFrame(self.data)
+        df = self.data.to_dataframe()
         n_unique_per_split = {len(df[df["split"] == split]["brightness"].unique()) for split in df["split"].unique()}
 
         # If a split has only one unique value, KDE plot will not work. Instead, we show the average brightness of the images.
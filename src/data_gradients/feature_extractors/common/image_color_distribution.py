@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from typing import Dict, Any
 
 from data_gradients.common.registry.registry import register_feature_extractor
 from data_gradients.feature_extractors.abstract_feature_extractor import AbstractFeatureExtractor
@@ -43,6 +44,33 @@ class ImageColorDistribution(AbstractFeatureExtractor):
         for i, color in enumerate(self.colors):
             pixel_frequency_per_channel[i] += np.histogram(sample.image.data[:, :, i], bins=256)[0]
 
+    def state_dict(self) -> Dict[str, Any]:
+        return {
+            "image_channels": self.image_channels,
+            "colors": self.colors,
+            "palette": self.palette,
+            "pixel_frequency_per_channel_per_split": self.pixel_frequency_per_channel_per_split,
+        }
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        self.image_channels = state_dict["image_channels"]
+        self.colors = state_dict["colors"]
+        self.palette = dict(state_dict["palette"])
+        self.pixel_frequency_per_channel_per_split = {split: counts.copy() for split, counts in state_dict["pixel_frequency_per_channel_per_split"].items()}
+
+    def merge(self, other: "ImageColorDistribution") -> "ImageColorDistribution":
+        self._check_can_merge(other)
+        other_state = other.state_dict()
+        if self.colors is None:
+            self.image_channels, self.colors = other_state["image_channels"], other_state["colors"]
+            self.palette.update(other_state["palette"])
+        for split, counts in other_state["pixel_frequency_per_channel_per_split"].items():
+            if split in self.pixel_frequency_per_channel_per_split:
+                self.pixel_frequency_per_channel_per_split[split] += counts
+            else:
+                self.pixel_frequency_per_channel_per_split[split] = counts.copy()
+        return self
+
     def aggregate(self) -> Feature:
         data = [
             {"split": split, "Color": color, "pixel_value": pixel_value, "n": n}
@@ -1,50 +1,49 @@
-from typing import List, Optional, Iterable
+from typing import List
+
+import cv2
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
 from data_gradients.common.registry.registry import register_feature_extractor
 from data_gradients.feature_extractors.abstract_feature_extractor import AbstractFeatureExtractor
 from data_gradients.feature_extractors.abstract_feature_extractor import Feature
-
-import os
-
+from data_gradients.feature_extractors.accumulators import ColumnarAccumulator, CATEGORY
 from data_gradients.utils.data_classes import ImageSample
 
 
 @register_feature_extractor()
 class ImageDuplicates(AbstractFeatureExtractor):
     """
-    Extracts image duplicates, in the directories train_image_dir, valid_image_dir (when present) and their intersection.
+    Extracts image duplicates, in the train split, the validation split and their intersection.
 
-    Under the hood, uses Difference Hashing (http://www.hackerfactor.com/blog/index.php?/archives/529-Kind-of-Like-That.html)
-     and considers duplicates if and only if they have the exact same hash code. This means that regardless of color format
-      (i.e BGR, RGB greyscale) duplicates will be found, but might result (rarely) in false positives.
+    Under the hood, uses Difference Hashing (http://www.hackerfactor.com/blog/index.php?/archives/529-Kind-of-Like-That.html).
+     The 64 bits hash of every image is computed when the sample is received, so images are never read twice from disk.
+     Images are considered duplicates if the Hamming distance between their hash codes is at most `max_distance` (by default, the exact same hash code).
+     Since the hash is computed on the grayscale image, duplicates will be found regardless of color format (i.e BGR, RGB greyscale),
+      but might result (rarely) in false positives.
 
     Attributes:
-        train_image_dir: str, The directory containing all train images. When None, will ask the user using prompt for input.
-
-        valid_image_dir: str. Ignored when val_data of the AbstractManager is None. The directory containing all
-         valid images. When None, will ask the user using prompt for input.
-
-
         The following attributes are populated after calling self.aggreagate():
 
-            self.train_dups: List[List[str]], a list of all image duplicate paths inside train_image_dir.
+            self.train_dups: List[List[str]], a list of all image duplicate sample ids inside the train split.
 
-            self.valid_dups: List[List[str]], a list of all image duplicate paths inside valid_image_dir.
+            self.valid_dups: List[List[str]], a list of all image duplicate sample ids inside the validation split.
 
-            self.intersection_dups: List[List[str]], a list of all image duplicate paths, that are duplicated in
-             valid_image_dir and train_image_dir (i.e images that appear in train and validation).
+            self.intersection_dups: List[List[str]], a list of all image duplicate sample ids, that are duplicated in
+             the validation split and the train split (i.e images that appear in train and validation).
 
-            train_dups_appearences: int, total image count of duplicated images in train_image_dir.
+            train_dups_appearences: int, total image count of duplicated images in the train split.
 
-            validation_dups_appearences, int, total image count of duplicated images in valid_image_dir.
+            validation_dups_appearences, int, total image count of duplicated images in the validation split.
 
-            intersection_train_appearnces, int, total image count in train_image_dir that appear in valid_image_dir.
+            intersection_train_appearnces, int, total image count in the train split that appear in the validation split.
 
-            intersection_val_appearnces int, total image count in valid_image_dir that appear in train_image_dir.
+            intersection_val_appearnces int, total image count in the validation split that appear in the train split.
 
 
         Example:
-            After running self.aggreagte() on COCO2017 detection dataset (train_image_dir="/data/coco/images/train2017/",
-             valid_image_dir=/data/coco/images/val2017/):
+            After running self.aggreagte() on COCO2017 detection dataset (with the image paths as sample ids):
 
             self.train_dups: [['/data/coco/images/train2017/000000216265.jpg', '/data/coco/images/train2017/000000411274.jpg']...]
             self.valid_dups: [] -> no duplicates in validation
@@ -56,164 +55,71 @@ class ImageDuplicates(AbstractFeatureExtractor):
             self.intersection_train_appearnces: 2
             self.intersection_val_appearnces: 2
 
-            IMPORTANT: We get len(self_train_dups) = 35, but there are 72 appearences pf duplicated images in the train directory.
+            IMPORTANT: We get len(self_train_dups) = 35, but there are 72 appearences pf duplicated images in the train split.
                 This is because we have two triplet duplicates inside our train data.
 
 
     NOTES:
-         - DOES NOT TAKE IN ACCOUNT ANY DATASET INTERNAL LOGIC, SIMPLY EXTRACTS THE DUPLICATES FROM THESE DIRECTORIES.
-         - If an image in the image directory can't be loaded, no duplicates are searched for the image.
-         - Supported image formats: 'JPEG', 'PNG', 'BMP', 'MPO', 'PPM', 'TIFF', 'GIF', 'SVG', 'PGM', 'PBM', 'WEBP'.
+         - Duplicates are searched in the images as they are received by the feature extractors, i.e. after the dataset internal logic
+           (e.g. augmentations) was applied.
     """
 
-    def __init__(self, train_image_dir: Optional[str] = None, valid_image_dir: Optional[str] = None):
-        """
-        :param train_image_dir: str = None, The directory containing all train images. When None, will ask the user
-            using prompt for input.
+    TRAIN_SPLIT = "train"
+    VALID_SPLIT = "val"
 
-        :param valid_image_dir: str = None. Ignored when val_data of the AbstractManager is None. The directory containing all
-            valid images. When None, will ask the user using prompt for input.
+    def __init__(self, max_distance: int = 0):
+        """
+        :param max_distance: Maximum Hamming distance between the 64 bits hash codes of two images to consider them duplicates.
+            0 only finds exact duplicates, higher values also find near duplicates (e.g. re-encoded or slightly resized images).
         """
         super().__init__()
+        if not 0 <= max_distance < 64:
+            raise ValueError(f"`max_distance` should be in [0, 63], got {max_distance}.")
+        self.max_distance = max_distance
+        self.data = ColumnarAccumulator(columns={"split": CATEGORY, "sample_id": object, "dhash": np.uint64})
         self.train_dups = None
         self.valid_dups = None
         self.intersection_dups = None
-        self.train_image_dir = train_image_dir
-        self.valid_image_dir = valid_image_dir
-
-    def setup_data_sources(self, train_data: Iterable, val_data: Iterable):
-        """
-        Called in AbstractManager.__init__
-        In case train_image_dir: str = None, valid_image_dir: str = None in __init__, will ask the user to pass them.
-
-        :param train_data: Iterable, the train_data used by AbstractManager (not used at the moment, but acts as a placeholder that
-            will later be used to derrive the diretory automatically according to its type - i.e ImageFolder.root etc).
-
-        :param  val_data: Iterbale, the val_Data used by AbstractManager.
-        """
-        # TODO: ADD AUTOMATIC EXTRACTION FOR SG DATASETS
-        if self.train_image_dir is None:
-            self.train_image_dir = self._get_image_dir("train")
-        if val_data is not None and self.valid_image_dir is None:
-            self.valid_image_dir = self._get_image_dir("validation")
-
-    def _get_image_dir(self, split: str) -> str:
-        p = input(f"Image duplicates extraction: please enter the full path to the directory containing all {split} images >>> \n")
-        if not os.path.exists(p):
-            raise ValueError(f"Path to the directory containing all {split} images does not exist.")
-        return p
+        self._has_valid_split = False
 
     def update(self, sample: ImageSample):
-        """
-        Passed as we only find the duplicates in self.aggregate (per sample updated logic does not fit here).
-        """
-        pass
+        self.data.append(split=sample.split, sample_id=sample.sample_id, dhash=compute_dhash(sample.image.as_rgb()))
 
     def _find_duplicates(self):
         """
-        Finds duplicates in self.train_image_dir, self.valid_image_dir (when present) and their intersection.
+        Finds duplicates in the train split, the validation split (when present) and their intersection.
         Populates self.train_dups, self.valid_dups, self.intersection_dups and the corresponding appearences count attributes
         self.train_dups_appearences, self.validation_dups_appearences, self.intersection_train_appearnces, self.intersection_val_appearnces.
         """
-        # LOCAL IMPORT TO AVOID DOWNLOADING TRANSFORMER WEIGHTS ON SG/DG IMPORT
-        from imagededup.methods import DHash
-
-        dhasher = DHash()
-
-        # encodings = { IMAGE_X_FNAME: IMAGE_X_ENCODING,...}
-        train_encodings = dhasher.encode_images(self.train_image_dir)
-        valid_encodings = dhasher.encode_images(self.valid_image_dir)
-
-        # ADD PATH PREFIXES, SO WE CAN DIFFER TRAIN/VALIDATION AFTER CALLING find_duplicates
-        # AND AVOID COLLISIONS IF SAME FNAMES ARE USED BETWEEN THE DATASETS
-        # encodings = { IMAGE_X_PATH: IMAGE_X_ENCODING,...}
-        train_encodings = {str(os.path.join(self.train_image_dir, k)): v for k, v in train_encodings.items()}
-        valid_encodings = {str(os.path.join(self.valid_image_dir, k)): v for k, v in valid_encodings.items()}
-
-        # PASS ALL ENCODINGS
-        all_encodings = {**train_encodings, **valid_encodings}
-
-        # dups = { IMAGE_X_PATH: [DUPLICATE_OF_IMAGE_X_PATH, DUPLICATE_2_OF_IMAGE_X_PATH...]...}
-        dups = dhasher.find_duplicates(encoding_map=all_encodings, max_distance_threshold=0)
-
-        # FILTER PATHS WHERE NO DUPLICATES WERE FOUND
-        dups = {k: v for k, v in dups.items() if len(v) > 0}
+        columns = self.data.to_dict()
+        splits, sample_ids = columns["split"], columns["sample_id"]
+        self._has_valid_split = bool(np.any(splits == self.VALID_SPLIT))
 
         train_dups = []
         valid_dups = []
         intersection_dups = []
-        dup_clique_heads = list(dups.keys())
-
-        # ITERATE THROUGH THE CLIQUE 'HEADS' (I.E SOME MEMBER REPRESENTING THE DUPLICATE CLIQUE)
-        for i in range(len(dup_clique_heads)):
-            dup_key = dup_clique_heads[i]
-
-            # IF THIS CLIQUE HEAD WAS ALREADY ADDED IN PREVIOUS ITERATIONS, SKIP IT TO AVOID ADDING THE SAME CLIQUE
-            # TWICE (SINCE find_duplicates WILL RETURN THE DUPLICATES IN EVERY MEMBER'S ENTRY)
-
-            if self._is_in_dup_clique(dup_key, train_dups) or self._is_in_dup_clique(dup_key, valid_dups) or self._is_in_dup_clique(dup_key, intersection_dups):
-                continue
-
-            # CREATE A 'CLIQUE` FROM THE MEMBER AND IT'S DUPLICATES:
-            # IMAGE_X_PATH: [DUPLICATE_OF_IMAGE_X_PATH, DUPLICATE_2_OF_IMAGE_X_PATH...] ->
-            # [IMAGE_X_PATH, DUPLICATE_OF_IMAGE_X_PATH, DUPLICATE_2_OF_IMAGE_X_PATH...]
-            dup_clique = self._make_dup_clique(dup_key, dups)
-
-            # IF THE CLIQUE HAS AT LEAST 2 PATHS IN THE TRAIN/VALIDATION DIR -
-            # ADD IT TO train_dups/valid_dups AFTER FILTERING PATHS OUTSIDE THE TRAIN/VALIDATION DIR.
-            if self._is_train_dup(dup_clique):
-                train_dups.append([d for d in dup_clique if d.startswith(self.train_image_dir)])
-            if self._is_valid_dup(dup_clique):
-                valid_dups.append([d for d in dup_clique if d.startswith(self.valid_image_dir)])
-
-            # IF THE CLIQUE HAS IT LEAST ONE PATH IN EACH - ADD IT TO intersection_dups
-            if self._is_intersection_dup(dup_clique):
-                intersection_dups.append(dup_clique)
+        intersection_train_appearnces, intersection_val_appearnces = 0, 0
+        for clique in find_duplicate_groups(columns["dhash"], max_distance=self.max_distance):
+            train_members = [str(sample_ids[i]) for i in clique if splits[i] == self.TRAIN_SPLIT]
+            valid_members = [str(sample_ids[i]) for i in clique if splits[i] == self.VALID_SPLIT]
+
+            # IF THE CLIQUE HAS AT LEAST 2 IMAGES IN THE TRAIN/VALIDATION SPLIT - ADD THEM TO train_dups/valid_dups.
+            if len(train_members) > 1:
+                train_dups.append(train_members)
+            if len(valid_members) > 1:
+                valid_dups.append(valid_members)
+
+            # IF THE CLIQUE HAS IT LEAST ONE IMAGE IN EACH - ADD IT TO intersection_dups
+            if train_members and valid_members:
+                intersection_dups.append(train_members + valid_members)
+                intersection_train_appearnces += len(train_members)
+                intersection_val_appearnces += len(valid_members)
 
         self.train_dups, self.valid_dups, self.intersection_dups = train_dups, valid_dups, intersection_dups
-        self.train_dups_appearences = self._count_dir_dup_appearences(self.train_dups, self.train_image_dir)
-        self.validation_dups_appearences = self._count_dir_dup_appearences(self.valid_dups, self.valid_image_dir)
-        self.intersection_train_appearnces = self._count_dir_dup_appearences(self.intersection_dups, self.train_image_dir)
-        self.intersection_val_appearnces = self._count_dir_dup_appearences(self.intersection_dups, self.valid_image_dir)
-
-    @staticmethod
-    def _is_in_dup_clique(sample: str, dup_clique_list: List[List[str]]) -> bool:
-        """
-        Whether sample is already in some duplicated clique in dup_clique_list.
-
-        :param sample: str, an image path
-        :param dup_clique_list: List[List[str]], list of duplicate image path cliques (lists).
-        """
-        return any([sample in d for d in dup_clique_list])
-
-    @staticmethod
-    def _make_dup_clique(dup_key: str, dups: List[str]):
-        dup_clique = [dup_key] + dups[dup_key]
-        return dup_clique
-
-    def _is_train_dup(self, dup_clique: List[str]) -> bool:
-        """
-        Whether the dup_clique contains duplicate image paths from train_image_dir.
-
-        :param dup_clique: List[str], list of duplicated image paths
-        """
-        return len([d for d in dup_clique if d.startswith(self.train_image_dir)]) > 1
-
-    def _is_valid_dup(self, dup_clique: List[str]) -> bool:
-        """
-        Whether the dup_clique contains duplicate image paths from valid_image_dir.
-
-        :param dup_clique: List[str], list of duplicated image paths
-        """
-        return len([d for d in dup_clique if d.startswith(self.valid_image_dir)]) > 1
-
-    def _is_intersection_dup(self, dup_clique: List[str]) -> bool:
-        """
-        Whether the dup_clique contains duplicate image paths from train_image_dir and valid_image_dir.
-
-        :param dup_clique: List[str], list of duplicated image paths
-        """
-        return len([d for d in dup_clique if d.startswith(self.train_image_dir)]) > 0 and len([d for d in dup_clique if d.startswith(self.valid_image_dir)]) > 0
+        self.train_dups_appearences = self._count_dup_appearences(self.train_dups)
+        self.validation_dups_appearences = self._count_dup_appearences(self.valid_dups)
+        self.intersection_train_appearnces = intersection_train_appearnces
+        self.intersection_val_appearnces = intersection_val_appearnces
 
     @staticmethod
     def _count_dup_appearences(dups: List[List[str]]) -> int:
@@ -222,13 +128,6 @@ class ImageDuplicates(AbstractFeatureExtractor):
         """
         return sum([len(d) for d in dups])
 
-    def _count_dir_dup_appearences(self, dups: List[List[str]], dir: str) -> int:
-        """
-        Counts the duplicate appearences inside dir = sum of the sizes of all
-         duplicate cliques in dups after filtering all paths not in dir.
-        """
-        return self._count_dup_appearences(list(map(lambda dup: [d for d in dup if d.startswith(dir)], dups)))
-
     def aggregate(self) -> Feature:
         self._find_duplicates()
         json = {"Train duplicates": self.train_dups, "Validation duplicates": self.valid_dups, "Intersection duplicates": self.intersection_dups}
@@ -244,14 +143,14 @@ class ImageDuplicates(AbstractFeatureExtractor):
     def _generate_description(self) -> str:
         if self.train_dups:
             desc = self._get_split_description(self.train_dups, "Train", self.train_dups_appearences)
-            if self.valid_image_dir is not None:
+            if self._has_valid_split:
                 desc += self._get_split_description(self.valid_dups, "Validation", self.validation_dups_appearences)
                 desc += f"\n\nThere are {len(self.intersection_dups)} duplicates between train and validation."
                 if len(self.intersection_dups):
                     desc = desc.replace(
                         "train and validation.",
-                        f"train and validation appearing {self.intersection_train_appearnces} times in the train image directory,"
-                        f" and {self.intersection_val_appearnces} times in the validation image directory.",
+                        f"train and validation appearing {self.intersection_train_appearnces} times in the train split,"
+                        f" and {self.intersection_val_appearnces} times in the validation split.",
                     )
 
             else:
@@ -270,3 +169,60 @@ class ImageDuplicates(AbstractFeatureExtractor):
         if len(dups) > 0:
             desc = desc.replace(".\n", f" appearing {appearences} times across the dataset.\n\n")
         return desc
+
+
+def compute_dhash(image: np.ndarray) -> np.uint64:
+    """Compute the 64 bits Difference Hash of an image.
+    The image is converted to grayscale and downscaled to 9x8, then each bit tells whether a pixel is brighter than its right neighbour.
+
+    :param image:   RGB image of shape [H, W, 3], or grayscale image of shape [H, W].
+    :return:        Hash code of the image.
+    """
+    grayscale = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+    resized = cv2.resize(np.ascontiguousarray(grayscale), (9, 8), interpolation=cv2.INTER_AREA)
+    bits = resized[:, 1:] > resized[:, :-1]
+    return np.packbits(bits).view(">u8")[0].astype(np.uint64)
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """Number of bits set in each element of a uint64 array."""
+    return np.unpackbits(values.astype(np.uint64).view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def find_duplicate_groups(hashes: np.ndarray, max_distance: int = 0) -> List[List[int]]:
+    """Group the hash codes that are within `max_distance` bits of each other (transitively).
+
+    Identical hash codes are grouped directly. Near duplicates are then found with multi-index hashing:
+    the 64 bits are split into `max_distance + 1` chunks, and two codes within `max_distance` bits of each other are equal on at least one chunk.
+    Only the codes sharing a chunk are compared, instead of every pair of codes.
+
+    :param hashes:          Hash codes, of shape [N] and dtype uint64.
+    :param max_distance:    Maximum Hamming distance between two codes to be considered duplicates.
+    :return:                Indices (in `hashes`) of the members of each group of duplicates. Groups of a single element are not returned.
+    """
+    unique_hashes, inverse = np.unique(np.asarray(hashes, dtype=np.uint64), return_inverse=True)
+    inverse = inverse.reshape(-1)
+    n_unique = len(unique_hashes)
+
+    rows, cols = [np.arange(n_unique)], [np.arange(n_unique)]
+    if max_distance > 0 and n_unique > 1:
+        chunk_edges = np.linspace(0, 64, max_distance + 2).astype(np.uint64)
+        for start, stop in zip(chunk_edges[:-1], chunk_edges[1:]):
+            chunk = (unique_hashes >> start) & ((np.uint64(1) << (stop - start)) - np.uint64(1))
+            order = np.argsort(chunk, kind="stable")
+            bucket_values, bucket_starts, bucket_sizes = np.unique(chunk[order], return_index=True, return_counts=True)
+            for bucket_start, bucket_size in zip(bucket_starts[bucket_sizes > 1], bucket_sizes[bucket_sizes > 1]):
+                members = order[bucket_start : bucket_start + bucket_size]
+                ii, jj = np.triu_indices(len(members), k=1)
+                is_close = _popcount(unique_hashes[members[ii]] ^ unique_hashes[members[jj]]) <= max_distance
+                rows.append(members[ii[is_close]])
+                cols.append(members[jj[is_close]])
+
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    graph = coo_matrix((np.ones(len(rows), dtype=bool), (rows, cols)), shape=(n_unique, n_unique))
+    _, group_of_unique = connected_components(graph, directed=False)
+
+    group_of_sample = group_of_unique[inverse]
+    order = np.argsort(group_of_sample, kind="stable")
+    groups = np.split(order, np.flatnonzero(np.diff(group_of_sample[order])) + 1)
+    return [group.tolist() for group in groups if len(group) > 1]
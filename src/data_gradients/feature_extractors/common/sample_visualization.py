@@ -1,6 +1,6 @@
 import numpy as np
 from collections import defaultdict
-from typing import Dict, List
+from typing import Dict, List, Any
 from abc import ABC, abstractmethod
 
 from data_gradients.utils.data_classes.data_samples import ImageSample
@@ -40,6 +40,19 @@ class AbstractSampleVisualization(AbstractFeatureExtractor, ABC):
             image = self._prepare_sample_visualization(sample=sample)
             split_images.append(image)
 
+    def state_dict(self) -> Dict[str, Any]:
+        return {"images_per_split": dict(self.images_per_split)}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        self.images_per_split = defaultdict(list, {split: list(images) for split, images in state_dict["images_per_split"].items()})
+
+    def merge(self, other: "AbstractSampleVisualization") -> "AbstractSampleVisualization":
+        self._check_can_merge(other)
+        for split, other_images in other.state_dict()["images_per_split"].items():
+            split_images = self.images_per_split[split]
+            split_images.extend(other_images[: self.n_rows * self.n_cols - len(split_images)])
+        return self
+
     @abstractmethod
     def _prepare_sample_visualization(self, sample: ImageSample) -> np.ndarray:
         """Combine image and label to a single image.
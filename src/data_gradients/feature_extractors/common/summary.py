@@ -1,5 +1,5 @@
 import dataclasses
-from typing import List
+from typing import List, Dict, Any
 
 import numpy as np
 from jinja2 import Template
@@ -56,12 +56,9 @@ class SummaryStats(AbstractFeatureExtractor):
         basic_stats.num_samples += 1
 
         if isinstance(sample, SegmentationSample):
-            contours = [contour for sublist in sample.contours for contour in sublist]
-            basic_stats.annotations_per_image.append(len(contours))
-
-            for contour in contours:
-                basic_stats.annotations_sizes.append(contour.area)
-                basic_stats.classes.append(contour.class_id)
+            basic_stats.annotations_per_image.append(len(sample.contours))
+            basic_stats.annotations_sizes.extend(sample.contours.areas.tolist())
+            basic_stats.classes.extend(sample.contours.class_ids.tolist())
 
             basic_stats.classes_count = len(sample.class_names)
 
@@ -75,6 +72,18 @@ class SummaryStats(AbstractFeatureExtractor):
 
             basic_stats.classes_count = len(sample.class_names)
 
+    def state_dict(self) -> Dict[str, Any]:
+        return {"stats": self.stats}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        self.stats = {split: dataclasses.replace(basic_stats) for split, basic_stats in state_dict["stats"].items()}
+
+    def merge(self, other: "SummaryStats") -> "SummaryStats":
+        self._check_can_merge(other)
+        for split, other_basic_stats in other.state_dict()["stats"].items():
+            self.stats[split] = merge_basic_statistics(self.stats.get(split, BasicStatistics()), other_basic_stats)
+        return self
+
     def aggregate(self) -> Feature:
         for basic_stats in self.stats.values():
             if basic_stats.num_samples > 0:
@@ -121,3 +130,22 @@ class SummaryStats(AbstractFeatureExtractor):
     @staticmethod
     def format_resolution(array: np.ndarray) -> str:
         return "x".join([str(int(x)) for x in array])
+
+
+def merge_basic_statistics(basic_stats, other_basic_stats):
+    """Merge the statistics accumulated (before aggregation) on 2 different parts of the same split.
+    Works for any statistics dataclass where `num_samples` is a count, lists are per sample/annotation records, and `classes_count` is constant.
+
+    :param basic_stats:         Statistics of the first part, updated inplace.
+    :param other_basic_stats:   Statistics of the second part.
+    :return:                    The merged statistics.
+    """
+    for field in dataclasses.fields(basic_stats):
+        value, other_value = getattr(basic_stats, field.name), getattr(other_basic_stats, field.name)
+        if isinstance(value, list):
+            value.extend(other_value)
+        elif field.name == "num_samples":
+            setattr(basic_stats, field.name, value + other_value)
+        elif field.name == "classes_count":
+            setattr(basic_stats, field.name, max(value, other_value))
+    return basic_stats
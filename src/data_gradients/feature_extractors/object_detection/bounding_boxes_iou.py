@@ -1,7 +1,6 @@
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 
 import numpy as np
-import pandas as pd
 import torch
 from torchvision.ops import box_iou
 
@@ -26,11 +25,17 @@ class DetectionBoundingBoxIoU(AbstractFeatureExtractor):
         :param num_bins:        Number of bins to use for the heatmap plot.
         :param class_agnostic:  If True, only check IoU of bounding boxes of the same class.
         """
-        self.data = []
         self.num_bins = num_bins
         self.class_agnostic = class_agnostic
         self._show_plot = True  # If there is nothing to show, self.show_plot will be set to False.
 
+        self.split_names: List[str] = []
+        self.class_names: Dict[int, str] = {}
+        # Number of IoU pairs per (split, class_id, IoU bin). The last bin counts the pairs with IoU=1, which are not displayed.
+        self.counts = np.zeros((0, 0, num_bins + 1), dtype=np.int64)
+        # Whether each class_id overlaps with any other box, regardless of `class_agnostic`. Used to select the classes to display.
+        self.class_overlaps = np.zeros(0, dtype=bool)
+
     def update(self, sample: DetectionSample):
         if len(sample.bboxes_xyxy) == 0:
             return
@@ -40,48 +45,77 @@ class DetectionBoundingBoxIoU(AbstractFeatureExtractor):
         iou[np.eye(iou.shape[0], dtype=bool)] = 0
 
         ii, jj = np.nonzero(iou)
-        for i, j in zip(ii, jj):
-            self.data.append(
-                {
-                    "split": sample.split,
-                    "class_id": sample.class_ids[i],
-                    "class_name": sample.class_names[sample.class_ids[i]],
-                    "other_class_id": sample.class_ids[j],
-                    "other_class_name": sample.class_names[sample.class_ids[j]],
-                    "iou": iou[i, j],
-                }
-            )
-
-    def _compute_cumulative_counts_at_thresholds(self, df: pd.DataFrame, class_names: List[str], num_bins: int) -> np.ndarray:
+        if len(ii) == 0:
+            return
+
+        class_ids = np.asarray(sample.class_ids, dtype=np.int64)
+        for class_id in np.unique(class_ids[ii]):
+            self.class_names.setdefault(int(class_id), sample.class_names[class_id])
+
+        class_overlaps = np.bincount(class_ids[ii]) > 0
+        if not self.class_agnostic:
+            same_class = class_ids[ii] == class_ids[jj]
+            ii, jj = ii[same_class], jj[same_class]
+
+        iou_bins = np.digitize(iou[ii, jj], bins=np.linspace(0, 1, self.num_bins + 1)) - 1
+        n_bins = self.num_bins + 1
+        counts = np.bincount(class_ids[ii] * n_bins + iou_bins, minlength=len(class_overlaps) * n_bins).reshape(-1, n_bins)
+        self._accumulate(split=sample.split, counts=counts, class_overlaps=class_overlaps)
+
+    def _accumulate(self, split: str, counts: np.ndarray, class_overlaps: np.ndarray):
+        """Add IoU counts of shape (n_classes, num_bins + 1) to the given split, growing the accumulated tensor if needed."""
+        if split not in self.split_names:
+            self.split_names.append(split)
+        n_splits, n_classes = len(self.split_names), max(self.counts.shape[1], len(counts), len(class_overlaps))
+        if self.counts.shape[:2] != (n_splits, n_classes):
+            grown_counts = np.zeros((n_splits, n_classes, self.num_bins + 1), dtype=np.int64)
+            grown_counts[: self.counts.shape[0], : self.counts.shape[1]] = self.counts
+            self.counts = grown_counts
+        if len(self.class_overlaps) < n_classes:
+            self.class_overlaps = np.concatenate([self.class_overlaps, np.zeros(n_classes - len(self.class_overlaps), dtype=bool)])
+
+        self.counts[self.split_names.index(split), : len(counts)] += counts
+        self.class_overlaps[: len(class_overlaps)] |= class_overlaps
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {"split_names": self.split_names, "class_names": self.class_names, "counts": self.counts, "class_overlaps": self.class_overlaps}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        self.split_names = list(state_dict["split_names"])
+        self.class_names = dict(state_dict["class_names"])
+        self.counts = state_dict["counts"].copy()
+        self.class_overlaps = state_dict["class_overlaps"].copy()
+
+    def merge(self, other: "DetectionBoundingBoxIoU") -> "DetectionBoundingBoxIoU":
+        self._check_can_merge(other)
+        if other.num_bins != self.num_bins or other.class_agnostic != self.class_agnostic:
+            raise ValueError("Cannot merge DetectionBoundingBoxIoU with different `num_bins` or `class_agnostic`.")
+        for class_id, class_name in other.class_names.items():
+            self.class_names.setdefault(class_id, class_name)
+        for split, split_counts in zip(other.split_names, other.counts):
+            self._accumulate(split=split, counts=split_counts, class_overlaps=other.class_overlaps)
+        return self
+
+    def _compute_cumulative_counts_at_thresholds(self, split_counts: np.ndarray, class_ids: np.ndarray) -> np.ndarray:
         """
         Compute the number of boxes per each class that is above a certain IoU threshold.
         """
-        counts = np.zeros((len(class_names), self.num_bins), dtype=int)
-        for i, class_name in enumerate(class_names):
-            for j in range(num_bins):
-                counts[i, j] = len(df[(df["class_name"] == class_name) & (df["iou_bins"] == j + 1)])
-
+        counts = split_counts[class_ids, : self.num_bins]
         counts = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1].astype(np.float32)
         return counts
 
     def aggregate(self) -> Feature:
-
-        df = pd.DataFrame(self.data).sort_values(by="class_id")
-
         bins = np.linspace(0, 1, self.num_bins + 1)
-        df["iou_bins"] = np.digitize(df["iou"].values, bins=bins)
 
-        class_names = list(df["class_name"].unique())
-
-        if not self.class_agnostic:
-            df = df[df["class_id"] == df["other_class_id"]]
+        class_ids = np.flatnonzero(self.class_overlaps)
+        class_names = [self.class_names[class_id] for class_id in class_ids]
 
         data = {}
         json = {}
 
-        splits = sorted(df["split"].unique())
+        splits = sorted(split for split, split_counts in zip(self.split_names, self.counts) if split_counts.sum() > 0)
         for split in splits:
-            counts = self._compute_cumulative_counts_at_thresholds(df[df["split"] == split], class_names, self.num_bins)
+            counts = self._compute_cumulative_counts_at_thresholds(self.counts[self.split_names.index(split)], class_ids)
 
             json[split] = counts.tolist()
 
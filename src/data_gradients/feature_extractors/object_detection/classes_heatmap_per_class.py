@@ -1,4 +1,4 @@
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Dict, Any
 import numpy as np
 from data_gradients.common.registry.registry import register_feature_extractor
 from data_gradients.utils.data_classes import DetectionSample
@@ -22,6 +22,10 @@ class DetectionClassHeatmap(BaseClassHeatmap):
         :param heatmap_shape:   Heatmap, in (H, W) format. Increase for more resolution, at the expense of processing speed.
         """
         super().__init__(n_rows=n_rows, n_cols=n_cols, heatmap_shape=heatmap_shape)
+        # Boxes are accumulated into 2D difference arrays: each box only adds +1/-1 on its 4 corners, and the heatmaps are recovered with a 2D cumsum.
+        # Arrays are only allocated for the classes that appear in each split. `class_ids_per_split[split][i]` is the class of the i-th array.
+        self.class_ids_per_split: Dict[str, np.ndarray] = {}
+        self.difference_maps_per_split: Dict[str, np.ndarray] = {}  # Each of shape (n_classes_in_split, heatmap_shape[0] + 1, heatmap_shape[1] + 1)
 
     def update(self, sample: DetectionSample):
 
@@ -30,15 +34,62 @@ class DetectionClassHeatmap(BaseClassHeatmap):
 
         original_shape = sample.image.shape[:2]
         bboxes_xyxy = scale_bboxes(old_shape=original_shape, new_shape=self.heatmap_shape, bboxes_xyxy=sample.bboxes_xyxy)
+        bboxes_xyxy = np.trunc(bboxes_xyxy).astype(np.int64).reshape(-1, 4)
+        x1, x2 = np.clip(bboxes_xyxy[:, [0, 2]], 0, self.heatmap_shape[1]).T
+        y1, y2 = np.clip(bboxes_xyxy[:, [1, 3]], 0, self.heatmap_shape[0]).T
 
-        max_class_id = max(sample.class_names.keys())
-        split_heatmap = self.heatmaps_per_split.get(sample.split, np.zeros((max_class_id + 1, *self.heatmap_shape)))
+        is_valid = (x2 > x1) & (y2 > y1)
+        class_ids = np.asarray(sample.class_ids, dtype=np.int64)[is_valid]
+        x1, y1, x2, y2 = x1[is_valid], y1[is_valid], x2[is_valid], y2[is_valid]
 
-        for class_id, (x1, y1, x2, y2) in zip(sample.class_ids, bboxes_xyxy):
-            x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-            split_heatmap[class_id, y1:y2, x1:x2] += 1
+        rows = self._get_rows(split=sample.split, class_ids=class_ids)
+        difference_maps = self.difference_maps_per_split[sample.split]
+        corners = (np.tile(rows, 4), np.concatenate([y1, y1, y2, y2]), np.concatenate([x1, x2, x1, x2]))
+        np.add.at(difference_maps, corners, np.repeat(np.array([1, -1, -1, 1], dtype=difference_maps.dtype), len(rows)))
 
-        self.heatmaps_per_split[sample.split] = split_heatmap
+    def _get_rows(self, split: str, class_ids: np.ndarray) -> np.ndarray:
+        """Index of the difference map of each class in the split, allocating the difference maps of the classes that were never seen."""
+        split_class_ids = self.class_ids_per_split.get(split, np.zeros(0, dtype=np.int64))
+        new_class_ids = np.setdiff1d(class_ids, split_class_ids)
+        if split not in self.difference_maps_per_split or len(new_class_ids):
+            self._add_classes(split=split, class_ids=new_class_ids)
+            split_class_ids = self.class_ids_per_split[split]
+
+        class_id_to_row = np.full(split_class_ids.max(initial=-1) + 1, -1, dtype=np.int64)
+        class_id_to_row[split_class_ids] = np.arange(len(split_class_ids))
+        return class_id_to_row[class_ids]
+
+    def _add_classes(self, split: str, class_ids: np.ndarray):
+        difference_maps = self.difference_maps_per_split.get(split, np.zeros((0, self.heatmap_shape[0] + 1, self.heatmap_shape[1] + 1), dtype=np.int32))
+        new_difference_maps = np.zeros((len(class_ids), *difference_maps.shape[1:]), dtype=difference_maps.dtype)
+        self.difference_maps_per_split[split] = np.concatenate([difference_maps, new_difference_maps])
+        self.class_ids_per_split[split] = np.concatenate([self.class_ids_per_split.get(split, np.zeros(0, dtype=np.int64)), class_ids])
+
+    def get_heatmaps_per_split(self) -> Dict[str, Dict[int, np.ndarray]]:
+        heatmaps_per_split = {}
+        for split, difference_maps in self.difference_maps_per_split.items():
+            heatmaps = difference_maps.cumsum(axis=1).cumsum(axis=2)[:, : self.heatmap_shape[0], : self.heatmap_shape[1]].astype(np.uint32)
+            class_ids = self.class_ids_per_split[split]
+            heatmaps_per_split[split] = {int(class_ids[row]): heatmaps[row] for row in np.argsort(class_ids)}
+        return heatmaps_per_split
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {"class_names": self.class_names, "class_ids_per_split": self.class_ids_per_split, "difference_maps_per_split": self.difference_maps_per_split}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        self.class_names = dict(state_dict["class_names"])
+        self.class_ids_per_split = {split: class_ids.copy() for split, class_ids in state_dict["class_ids_per_split"].items()}
+        self.difference_maps_per_split = {split: maps.copy() for split, maps in state_dict["difference_maps_per_split"].items()}
+
+    def merge(self, other: "DetectionClassHeatmap") -> "DetectionClassHeatmap":
+        self._check_can_merge(other)
+        other_state = other.state_dict()
+        if not self.class_names:
+            self.class_names = dict(other_state["class_names"])
+        for split, other_class_ids in other_state["class_ids_per_split"].items():
+            rows = self._get_rows(split=split, class_ids=other_class_ids)
+            self.difference_maps_per_split[split][rows] += other_state["difference_maps_per_split"][split]
+        return self
 
     def _generate_title(self) -> str:
         return "Bounding Box Density"
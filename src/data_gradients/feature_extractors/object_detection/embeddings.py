@@ -0,0 +1,135 @@
+import os
+import hashlib
+from typing import Optional, Dict, Tuple
+
+import numpy as np
+import torch
+from torch.nn import Identity
+from torchvision.models import get_model, get_model_weights
+
+from data_gradients.utils.data_classes.image_channels import BGRChannels, GrayscaleChannels, ImageChannels
+
+DTYPES = {"float32": torch.float32, "float16": torch.float16, "bfloat16": torch.bfloat16}
+
+
+class CropEmbedder:
+    """Compute embeddings of image crops with a torchvision classification backbone, whose classification head is removed.
+
+    The backbone is only instantiated (and its weights downloaded) the first time an embedding is computed.
+    """
+
+    def __init__(
+        self,
+        backbone: str = "swin_v2_b",
+        weights: Optional[str] = "DEFAULT",
+        precision: str = "float32",
+        device: Optional[str] = None,
+        channels_last: bool = True,
+    ):
+        """
+        :param backbone:        Name of a torchvision classification model (e.g. "swin_v2_b", "resnet18", "mobilenet_v3_small", ...).
+        :param weights:         Name of the torchvision weights to load for the backbone (e.g. "DEFAULT", "IMAGENET1K_V1"). None for random weights.
+        :param precision:       Precision in which the backbone runs. One of "float32", "float16" or "bfloat16".
+        :param device:          Device on which the backbone runs. By default, "cuda" if available, "cpu" otherwise.
+        :param channels_last:   If True, use the channels-last memory format, which is faster for convolutional backbones.
+        """
+        if precision not in DTYPES:
+            raise ValueError(f"`precision={precision}` is not supported. Should be one of {list(DTYPES.keys())}.")
+        self.backbone = backbone
+        self.weights = weights
+        self.precision = precision
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.channels_last = channels_last
+
+        weights_enum = get_model_weights(backbone)
+        self.preprocessor = (weights_enum[weights] if weights is not None else weights_enum.DEFAULT).transforms()
+        self._model: Optional[torch.nn.Module] = None
+
+    @property
+    def name(self) -> str:
+        """Identifies the embeddings that this embedder produces. Embeddings with different names are not comparable."""
+        return f"{self.backbone}-{self.weights}-{self.precision}"
+
+    @property
+    def model(self) -> torch.nn.Module:
+        if self._model is None:
+            model = get_model(self.backbone, weights=self.weights)
+            for head_name in ("head", "fc", "classifier"):
+                if hasattr(model, head_name):
+                    setattr(model, head_name, Identity())
+                    break
+            model = model.eval().to(device=self.device, dtype=DTYPES[self.precision])
+            if self.channels_last:
+                model = model.to(memory_format=torch.channels_last)
+            self._model = model
+        return self._model
+
+    def preprocess(self, crop: np.ndarray, image_channels: ImageChannels) -> torch.Tensor:
+        """Convert a uint8 crop of shape [H, W, C] into a normalized tensor of shape [3, H', W'], with H' and W' fixed by the backbone.
+
+        :param crop:            Crop of the image, channels last.
+        :param image_channels:  Channels of the image. BGR crops are converted to RGB and grayscale crops are repeated over 3 channels.
+        :return:                Preprocessed crop, ready to be stacked into a batch.
+        """
+        if isinstance(image_channels, BGRChannels):
+            crop = crop[:, :, ::-1]
+        elif isinstance(image_channels, GrayscaleChannels):
+            crop = np.repeat(crop[..., np.newaxis] if crop.ndim == 2 else crop, 3, axis=2)
+        crop = torch.from_numpy(np.ascontiguousarray(crop.transpose((2, 0, 1)))).float() / 255
+        return self.preprocessor(crop)
+
+    def embed(self, crops: torch.Tensor) -> torch.Tensor:
+        """Compute the embeddings of a batch of preprocessed crops.
+
+        :param crops:   Preprocessed crops, of shape [N, 3, H, W].
+        :return:        Embeddings of shape [N, D], in float32 and on cpu.
+        """
+        crops = crops.to(device=self.device, dtype=DTYPES[self.precision])
+        if self.channels_last:
+            crops = crops.contiguous(memory_format=torch.channels_last)
+        with torch.inference_mode():
+            embeddings = self.model(crops)
+        return embeddings.float().cpu()
+
+    def __getstate__(self) -> Dict:
+        # The backbone is not sent along with the embedder (e.g. to worker processes), it is re-instantiated when needed.
+        state = self.__dict__.copy()
+        state["_model"] = None
+        return state
+
+
+class EmbeddingCache:
+    """On-disk cache of crop embeddings, so that re-running an analysis only computes the embeddings of new crops.
+
+    Embeddings are stored in one file per image, keyed by the hash of the image content. Within this file, each embedding is keyed by its box.
+    """
+
+    def __init__(self, cache_dir: str, embedder_name: str):
+        """
+        :param cache_dir:       Directory where the embeddings are saved.
+        :param embedder_name:   Name of the embedder (see `CropEmbedder.name`). Embeddings of different embedders are stored separately.
+        """
+        self.cache_dir = os.path.join(cache_dir, embedder_name)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def hash_image(image: np.ndarray) -> str:
+        return hashlib.blake2b(np.ascontiguousarray(image).tobytes(), digest_size=16).hexdigest()
+
+    def _path(self, image_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"{image_hash}.npz")
+
+    def load(self, image_hash: str) -> Dict[Tuple[int, int, int, int], np.ndarray]:
+        """Load all the embeddings of an image, keyed by box (x1, y1, x2, y2). Empty if the image was never cached."""
+        path = self._path(image_hash)
+        if not os.path.exists(path):
+            return {}
+        with np.load(path) as cached:
+            return {tuple(box): embedding for box, embedding in zip(cached["boxes"].tolist(), cached["embeddings"])}
+
+    def save(self, image_hash: str, embeddings: Dict[Tuple[int, int, int, int], np.ndarray]):
+        """Add embeddings to the ones already cached for an image."""
+        embeddings = {**self.load(image_hash), **embeddings}
+        tmp_path = self._path(image_hash) + ".tmp.npz"  # Written then renamed, so that an interruption never leaves a partial file.
+        np.savez(tmp_path, boxes=np.array(list(embeddings.keys()), dtype=np.int64), embeddings=np.stack(list(embeddings.values())))
+        os.replace(tmp_path, self._path(image_hash))
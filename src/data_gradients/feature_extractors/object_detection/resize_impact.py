@@ -7,6 +7,7 @@ from data_gradients.common.registry.registry import register_feature_extractor
 from data_gradients.feature_extractors.abstract_feature_extractor import Feature
 from data_gradients.utils.data_classes import DetectionSample
 from data_gradients.feature_extractors.abstract_feature_extractor import AbstractFeatureExtractor
+from data_gradients.feature_extractors.accumulators import ColumnarAccumulator, CATEGORY
 from data_gradients.visualize.plot_options import HeatmapOptions
 
 DEFAULT_SIZES = [
@@ -52,23 +53,25 @@ class DetectionResizeImpact(AbstractFeatureExtractor):
         self.resizing_sizes = resizing_sizes or DEFAULT_SIZES
         self.area_thresholds = area_thresholds or DEFAULT_AREA_THRESHOLDS
         self.include_median_size = include_median_size
-        self.data = []
+        self.data = ColumnarAccumulator(
+            columns={"split": CATEGORY, "image_height": np.int32, "image_width": np.int32, "bboxes_height": np.float64, "bboxes_width": np.float64}
+        )
 
     def update(self, sample: DetectionSample):
         height, width = sample.image.shape[0], sample.image.shape[1]
-        for bbox_xyxy in sample.bboxes_xyxy:
-            self.data.append(
-                {
-                    "split": sample.split,
-                    "image_height": height,
-                    "image_width": width,
-                    "bboxes_height": bbox_xyxy[3] - bbox_xyxy[1],
-                    "bboxes_width": bbox_xyxy[2] - bbox_xyxy[0],
-                }
-            )
+        bboxes_xyxy = np.asarray(sample.bboxes_xyxy).reshape(-1, 4)
+        if len(bboxes_xyxy) == 0:
+            return
+        self.data.extend(
+            split=sample.split,
+            image_height=height,
+            image_width=width,
+            bboxes_height=bboxes_xyxy[:, 3] - bboxes_xyxy[:, 1],
+            bboxes_width=bboxes_xyxy[:, 2] - bboxes_xyxy[:, 0],
+        )
 
     def aggregate(self) -> Feature:
-        df = pd.DataFrame(self.data)
+        df = self.data.to_dataframe()
 
         median_size = (int(df["image_width"].median()), int(df["image_height"].median()))
         resizing_size = set(self.resizing_sizes)
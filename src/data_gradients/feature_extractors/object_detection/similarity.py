@@ -1,69 +1,72 @@
-from typing import List, Optional
+from typing import List, Optional, Dict, Any, Tuple
 
 import numpy as np
-from torch.nn import Identity
-from torchvision.models import swin_v2_b, Swin_V2_B_Weights
 
 from data_gradients.common.registry.registry import register_feature_extractor
 from data_gradients.feature_extractors.abstract_feature_extractor import Feature
 from data_gradients.utils.data_classes import DetectionSample
 from data_gradients.visualize.plot_options import HeatmapOptions
 from data_gradients.feature_extractors.abstract_feature_extractor import AbstractFeatureExtractor
+from data_gradients.feature_extractors.object_detection.embeddings import CropEmbedder, EmbeddingCache
 import torch
 from torchvision.ops import box_iou
-from data_gradients.utils.data_classes.image_channels import BGRChannels, RGBChannels, ImageChannels, GrayscaleChannels
+from data_gradients.utils.data_classes.image_channels import BGRChannels, RGBChannels, GrayscaleChannels
 
 
 @register_feature_extractor("DetectionClassSimilarity")
 class DetectionClassSimilarity(AbstractFeatureExtractor):
     """
-    Analyzes and visualizes the similarity of class instances across dataset splits using a pre-trained Vision Transformer model.
+    Analyzes and visualizes the similarity of class instances across dataset splits using a pre-trained backbone (Swin-V2-B by default).
+
+    Crops are buffered and embedded in mini-batches of `batch_size` crops, which can come from different samples.
+    When `cache_dir` is set, embeddings are saved on disk, so that running the analysis again only computes the embeddings of new crops.
 
     Attributes:
-        model (torch.nn.Module): The pre-trained Vision Transformer model.
-        image_preprocessor (Callable): Function to preprocess images for model input.
-        features (List[torch.Tensor]): Extracted feature vectors from detected objects.
-        instances_class_ids (List[int]): Class IDs corresponding to each feature vector.
+        embedder (CropEmbedder): Backbone used to compute the embeddings of the crops. Instantiated lazily.
+        class_feature_sums (torch.Tensor): Sum of the normalized feature vectors of the instances of each class, of shape [num_classes, D].
+        class_instances_count (torch.Tensor): Number of instances of each class, of shape [num_classes].
         all_classes_list (List[str]): All unique class names encountered in the dataset.
         iou_threshold (float): Threshold for Intersection over Union (IoU) to exclude overlapping bounding boxes.
     """
 
-    def __init__(self, iou_threshold: Optional[float] = 0.1):
+    def __init__(
+        self,
+        iou_threshold: Optional[float] = 0.1,
+        backbone: str = "swin_v2_b",
+        weights: Optional[str] = "DEFAULT",
+        batch_size: int = 64,
+        precision: str = "float32",
+        device: Optional[str] = None,
+        channels_last: bool = True,
+        cache_dir: Optional[str] = None,
+    ):
         """
-        Initializes the feature extractor with a pre-trained Vision Transformer model and an IoU threshold for bounding box filtering.
-
-        :param iou_threshold: Optional[float]. IoU threshold to exclude overlapping bounding boxes. If None, no filtering is applied.
+        Initializes the feature extractor with a pre-trained backbone and an IoU threshold for bounding box filtering.
+
+        :param iou_threshold:   Optional[float]. IoU threshold to exclude overlapping bounding boxes. If None, no filtering is applied.
+        :param backbone:        Name of the torchvision classification model used to embed the crops (e.g. "swin_v2_b", "resnet18", "mobilenet_v3_small").
+        :param weights:         Name of the torchvision weights of the backbone. None for random weights.
+        :param batch_size:      Number of crops embedded together.
+        :param precision:       Precision in which the backbone runs. One of "float32", "float16" or "bfloat16".
+        :param device:          Device on which the backbone runs. By default, "cuda" if available, "cpu" otherwise.
+        :param channels_last:   If True, run the backbone in channels-last memory format.
+        :param cache_dir:       Directory where the embeddings are cached. If None, embeddings are not cached.
         """
-        self.model = swin_v2_b(weights=Swin_V2_B_Weights.IMAGENET1K_V1)
-        self.model.eval()
-        self.model.head = Identity()
-        self.image_preprocessor = Swin_V2_B_Weights.IMAGENET1K_V1.transforms()
-
-        self.features = []
-        self.instances_class_ids = []
+        self.embedder = CropEmbedder(backbone=backbone, weights=weights, precision=precision, device=device, channels_last=channels_last)
+        self.cache = EmbeddingCache(cache_dir=cache_dir, embedder_name=self.embedder.name) if cache_dir is not None else None
+        self.batch_size = batch_size
+
+        # Mean cosine similarity between the instances of 2 classes is the dot product of the means of their normalized feature vectors,
+        # so only the sum of the normalized feature vectors of each class is kept, instead of the feature vectors of every instance.
+        self.class_feature_sums: Optional[torch.Tensor] = None
+        self.class_instances_count = torch.zeros(0, dtype=torch.int64)
         self.all_classes_list = None
         self.iou_threshold = iou_threshold
 
-    def extract_features(self, cropped_images: List[np.ndarray], image_channels: ImageChannels):
-        """
-        Extracts feature vectors from a list of cropped images using the pre-trained model.
-
-        :param cropped_images: List[np.ndarray]. List of cropped images from detected objects.
-        :param image_channels: ImageChannels. When BGRChannels, will reverse the channels.
-        :return: List[torch.Tensor]. Extracted feature vectors for each image.
-        """
-        # Process each image individually since crops are of varying sizes
-        if isinstance(image_channels, BGRChannels):
-            cropped_images = [c[:, :, ::-1].copy() for c in cropped_images]
-        elif isinstance(image_channels, GrayscaleChannels):
-            cropped_images = [np.repeat(c[..., np.newaxis] if c.ndim == 2 else c, 3, axis=2) for c in cropped_images]
-        cropped_images = [torch.from_numpy(c.transpose((2, 0, 1))).type(torch.FloatTensor) for c in cropped_images]
-        cropped_images = [c / 255 for c in cropped_images]
-        cropped_images = [self.image_preprocessor(c) for c in cropped_images]
-        cropped_images = torch.stack(cropped_images)
-        with torch.no_grad():
-            extracted_features = self.model(cropped_images)
-        return extracted_features
+        # Crops waiting to be embedded, with their class id and their cache key (image hash and box).
+        self._pending_crops: List[torch.Tensor] = []
+        self._pending_class_ids: List[int] = []
+        self._pending_cache_keys: List[Optional[Tuple[str, Tuple[int, int, int, int]]]] = []
 
     def update(self, sample: DetectionSample):
         """
@@ -71,12 +74,10 @@ class DetectionClassSimilarity(AbstractFeatureExtractor):
 
         :param sample: DetectionSample. The new sample to process, containing image data and bounding boxes.
         """
-        image = sample.image  # np.ndarray of shape [H, W, C] - The image as a numpy array with channels last
+        image = sample.image.to_uint8().as_numpy()  # np.ndarray of shape [H, W, C] - The image as a numpy array with channels last
         image_height, image_width = image.shape[:2]
-        cropped_images = []
-        class_ids = []
         iou_matrix = None
-        image_channels = sample.image_channels
+        image_channels = sample.image.channels
         if not isinstance(image_channels, BGRChannels) and not isinstance(image_channels, RGBChannels) and not isinstance(image_channels, GrayscaleChannels):
             raise RuntimeError(f"Similarity feature only works with RGB, BGR or Greyscale samples, got {image_channels}")
 
@@ -86,19 +87,46 @@ class DetectionClassSimilarity(AbstractFeatureExtractor):
             bboxes = torch.tensor(sample.bboxes_xyxy)
             iou_matrix = box_iou(bboxes, bboxes)
 
+        image_hash = self.cache.hash_image(image) if self.cache is not None else None
+        cached_embeddings = self.cache.load(image_hash) if self.cache is not None else {}
+        cached_features, cached_class_ids = [], []
+
         for idx, (class_id, bbox_xyxy) in enumerate(zip(sample.class_ids, sample.bboxes_xyxy)):
             x1, y1, x2, y2 = map(int, bbox_xyxy)  # Convert to integer if necessary
             x1, x2, y1, y2 = self._clip_to_image_bounds(image_height, image_width, x1, x2, y1, y2)
 
             # Check if bbox coordinates are valid and area is at least 20 pixels
             if self._is_valid_coordinates(x1, x2, y1, y2) and not self._should_exclude_based_on_iou(iou_matrix, idx):
+                box = (x1, y1, x2, y2)
+                if box in cached_embeddings:
+                    cached_features.append(cached_embeddings[box])
+                    cached_class_ids.append(class_id)
+                    continue
                 cropped_image = image[y1:y2, x1:x2]  # Crop using numpy slicing
-                cropped_images.append(cropped_image)
-                class_ids.append(class_id)
-        if len(cropped_images):
-            extracted_features = self.extract_features(cropped_images, image_channels)
-            self.features.append(extracted_features)
-            self.instances_class_ids.extend(class_ids)
+                self._pending_crops.append(self.embedder.preprocess(cropped_image, image_channels))
+                self._pending_class_ids.append(class_id)
+                self._pending_cache_keys.append((image_hash, box) if self.cache is not None else None)
+                if len(self._pending_crops) >= self.batch_size:
+                    self._embed_pending_crops()
+
+        if cached_features:
+            self._accumulate_features(torch.from_numpy(np.stack(cached_features)), cached_class_ids)
+
+    def _embed_pending_crops(self):
+        """Embed all the buffered crops in a single batch, and save their embeddings into the cache."""
+        if not self._pending_crops:
+            return
+        extracted_features = self.embedder.embed(torch.stack(self._pending_crops))
+        self._accumulate_features(extracted_features, self._pending_class_ids)
+
+        if self.cache is not None:
+            embeddings_per_image: Dict[str, Dict[Tuple[int, int, int, int], np.ndarray]] = {}
+            for (image_hash, box), embedding in zip(self._pending_cache_keys, extracted_features.numpy()):
+                embeddings_per_image.setdefault(image_hash, {})[box] = embedding
+            for image_hash, embeddings in embeddings_per_image.items():
+                self.cache.save(image_hash, embeddings)
+
+        self._pending_crops, self._pending_class_ids, self._pending_cache_keys = [], [], []
 
     def _is_valid_coordinates(self, x1, x2, y1, y2) -> bool:
         """
@@ -153,48 +181,79 @@ class DetectionClassSimilarity(AbstractFeatureExtractor):
                 exclude = max_iou > self.iou_threshold
         return exclude
 
+    def _accumulate_features(self, features: torch.Tensor, class_ids: List[int]):
+        """Add normalized feature vectors to the sums of their classes.
+
+        :param features:    Feature vectors of shape [N, D].
+        :param class_ids:   Class id of each feature vector.
+        """
+        class_ids = torch.as_tensor(np.asarray(class_ids), dtype=torch.int64)
+        norm_features = features.double() / features.double().norm(dim=1, keepdim=True)
+        self._grow(num_classes=int(class_ids.max()) + 1, feature_dim=features.shape[1])
+        self.class_feature_sums.index_add_(0, class_ids, norm_features)
+        self.class_instances_count += torch.bincount(class_ids, minlength=len(self.class_instances_count))
+
+    def _grow(self, num_classes: int, feature_dim: int):
+        """Make sure that the per-class accumulators can hold at least `num_classes` classes."""
+        if self.class_feature_sums is None:
+            self.class_feature_sums = torch.zeros((0, feature_dim), dtype=torch.float64)
+        missing = num_classes - len(self.class_instances_count)
+        if missing > 0:
+            self.class_feature_sums = torch.cat([self.class_feature_sums, torch.zeros((missing, feature_dim), dtype=torch.float64)])
+            self.class_instances_count = torch.cat([self.class_instances_count, torch.zeros(missing, dtype=torch.int64)])
+
+    def state_dict(self) -> Dict[str, Any]:
+        self._embed_pending_crops()
+        return {
+            "class_feature_sums": self.class_feature_sums,
+            "class_instances_count": self.class_instances_count,
+            "all_classes_list": self.all_classes_list,
+        }
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        self.class_feature_sums = None if state_dict["class_feature_sums"] is None else state_dict["class_feature_sums"].clone()
+        self.class_instances_count = state_dict["class_instances_count"].clone()
+        self.all_classes_list = state_dict["all_classes_list"]
+
+    def merge(self, other: "DetectionClassSimilarity") -> "DetectionClassSimilarity":
+        self._check_can_merge(other)
+        other_state = other.state_dict()
+        if other_state["class_feature_sums"] is not None:
+            other_sums, other_counts = other_state["class_feature_sums"], other_state["class_instances_count"]
+            self._grow(num_classes=len(other_counts), feature_dim=other_sums.shape[1])
+            self.class_feature_sums[: len(other_counts)] += other_sums
+            self.class_instances_count[: len(other_counts)] += other_counts
+        if self.all_classes_list is None:
+            self.all_classes_list = other_state["all_classes_list"]
+        return self
+
     def aggregate(self) -> Feature:
         """
         Aggregates extracted features to compute the class-to-class similarity and prepares the data for visualization.
 
         :return: Feature. The aggregated feature containing the similarity data and visualization details.
         """
-        # Concatenate all features and class IDs
-        all_features = torch.cat(self.features, dim=0)
-        all_class_ids = torch.tensor(self.instances_class_ids, dtype=torch.int64)
-
-        # Normalize the feature vectors
-        norm_features = all_features / all_features.norm(dim=1, keepdim=True)
+        self._embed_pending_crops()
 
-        # Initialize the similarity table
         num_classes = len(self.all_classes_list)
-        similarity_table = torch.zeros((num_classes, num_classes))
+        self._grow(num_classes=num_classes, feature_dim=self.class_feature_sums.shape[1])
+        instances_count = self.class_instances_count[:num_classes].numpy()
 
-        # Prepare the JSON object
-        json_data = {}
-        instances_count = np.zeros(len(self.all_classes_list))
+        # Mean of the normalized feature vectors of each class. The classes without instances have a null similarity with every other class.
+        class_centroids = self.class_feature_sums[:num_classes] / self.class_instances_count[:num_classes].clamp(min=1).unsqueeze(1)
+        similarity_table_np = (class_centroids @ class_centroids.T).float().numpy()
 
-        # Calculate the average similarity for each class pair
+        json_data = {}
         for class_id_i in range(num_classes):
             for class_id_j in range(num_classes):
-                indices_i = (all_class_ids == class_id_i).nonzero(as_tuple=True)[0]
-                indices_j = (all_class_ids == class_id_j).nonzero(as_tuple=True)[0]
-                class_pair_similarities = torch.mm(norm_features[indices_i], norm_features[indices_j].T)
-                average_similarity = class_pair_similarities.mean().item() if class_pair_similarities.numel() > 0 else 0
-                similarity_table[class_id_i, class_id_j] = average_similarity
-
                 class_name_i = self.all_classes_list[class_id_i]
                 class_name_j = self.all_classes_list[class_id_j]
                 key = f"{class_name_i}-{class_name_j}"
                 json_data[key] = {
-                    "average_similarity": average_similarity,
-                    f"{class_name_i}_instances": len(indices_i),
-                    f"{class_name_j}_instances": len(indices_j),
+                    "average_similarity": float(similarity_table_np[class_id_i, class_id_j]),
+                    f"{class_name_i}_instances": int(instances_count[class_id_i]),
+                    f"{class_name_j}_instances": int(instances_count[class_id_j]),
                 }
-                instances_count[class_id_i] = len(indices_i)
-
-        # Convert the similarity table to a numpy array
-        similarity_table_np = similarity_table.numpy()
 
         num_clases_for_plot = min(num_classes, 15)
 
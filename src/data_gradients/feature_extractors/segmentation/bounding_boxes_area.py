@@ -1,10 +1,11 @@
-import pandas as pd
+import numpy as np
 
 from data_gradients.common.registry.registry import register_feature_extractor
 from data_gradients.feature_extractors.abstract_feature_extractor import Feature
 from data_gradients.utils.data_classes import SegmentationSample
 from data_gradients.visualize.seaborn_renderer import ViolinPlotOptions
 from data_gradients.feature_extractors.abstract_feature_extractor import AbstractFeatureExtractor
+from data_gradients.feature_extractors.accumulators import ColumnarAccumulator, CATEGORY
 from data_gradients.feature_extractors.utils import MostImportantValuesSelector
 
 
@@ -29,25 +30,20 @@ class SegmentationBoundingBoxArea(AbstractFeatureExtractor):
                 - 'min_max':        Returns the (top k)/2 rows with the biggest average values, and the (top k)/2 with the smallest average values.
         """
         self.value_extractor = MostImportantValuesSelector(topk=topk, prioritization_mode=prioritization_mode)
-        self.data = []
+        self.data = ColumnarAccumulator(columns={"split": CATEGORY, "class_name": CATEGORY, "class_id": np.int64, "relative_bbox_area": np.float64})
 
     def update(self, sample: SegmentationSample):
         image_area = sample.image.shape[0] * sample.image.shape[1]
-        for class_channel in sample.contours:
-            for contour in class_channel:
-                class_id = contour.class_id
-                class_name = sample.class_names[class_id]
-                self.data.append(
-                    {
-                        "split": sample.split,
-                        "class_name": class_name,
-                        "class_id": class_id,
-                        "relative_bbox_area": 100 * (contour.bbox_area / image_area),
-                    }
-                )
+        contours = sample.contours
+        self.data.extend(
+            split=sample.split,
+            class_name=[sample.class_names[class_id] for class_id in contours.class_ids],
+            class_id=contours.class_ids,
+            relative_bbox_area=100 * (contours.bbox_areas / image_area),
+        )
 
     def aggregate(self) -> Feature:
-        df = pd.DataFrame(self.data)
+        df = self.data.to_dataframe()
 
         df = self.value_extractor.select(df=df, id_col="class_id", split_col="split", value_col="relative_bbox_area")
 
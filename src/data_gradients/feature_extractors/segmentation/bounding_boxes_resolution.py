@@ -1,4 +1,4 @@
-import pandas as pd
+import numpy as np
 
 from data_gradients.common.registry.registry import register_feature_extractor
 from data_gradients.feature_extractors.abstract_feature_extractor import Feature
@@ -6,6 +6,7 @@ from data_gradients.utils.common import LABELS_PALETTE
 from data_gradients.utils.data_classes import SegmentationSample
 from data_gradients.visualize.seaborn_renderer import Hist2DPlotOptions
 from data_gradients.feature_extractors.abstract_feature_extractor import AbstractFeatureExtractor
+from data_gradients.feature_extractors.accumulators import ColumnarAccumulator, CATEGORY
 
 
 @register_feature_extractor()
@@ -19,26 +20,21 @@ class SegmentationBoundingBoxResolution(AbstractFeatureExtractor):
     """
 
     def __init__(self):
-        self.data = []
+        self.data = ColumnarAccumulator(columns={"split": CATEGORY, "class_name": CATEGORY, "height": np.float64, "width": np.float64})
 
     def update(self, sample: SegmentationSample):
 
         height, width = sample.image.shape[:2]
-        for j, class_channel in enumerate(sample.contours):
-            for contour in class_channel:
-                class_id = contour.class_id
-                class_name = sample.class_names[class_id]
-                self.data.append(
-                    {
-                        "split": sample.split,
-                        "class_name": class_name,
-                        "height": 100 * (contour.h / height),  # TODO: Decide to divide it by image height or not...
-                        "width": 100 * (contour.w / width),
-                    }
-                )
+        contours = sample.contours
+        self.data.extend(
+            split=sample.split,
+            class_name=[sample.class_names[class_id] for class_id in contours.class_ids],
+            height=100 * (contours.heights / height),  # TODO: Decide to divide it by image height or not...
+            width=100 * (contours.widths / width),
+        )
 
     def aggregate(self) -> Feature:
-        df = pd.DataFrame(self.data)
+        df = self.data.to_dataframe()
 
         plot_options = Hist2DPlotOptions(
             x_label_key="width",
@@ -1,3 +1,5 @@
+from typing import Dict, Any
+
 import pandas as pd
 
 from data_gradients.common.registry.registry import register_feature_extractor
@@ -6,6 +8,7 @@ from data_gradients.utils.data_classes import SegmentationSample
 from data_gradients.visualize.seaborn_renderer import BarPlotOptions
 from data_gradients.feature_extractors.abstract_feature_extractor import AbstractFeatureExtractor
 from data_gradients.feature_extractors.utils import MostImportantValuesSelector
+from data_gradients.feature_extractors.accumulators import HistogramAccumulator
 
 
 @register_feature_extractor()
@@ -31,26 +34,40 @@ class SegmentationClassFrequency(AbstractFeatureExtractor):
                 - 'min_max':        Returns the (top k)/2 rows with the biggest average values, and the (top k)/2 with the smallest average values.
         """
         self.value_extractor = MostImportantValuesSelector(topk=topk, prioritization_mode=prioritization_mode)
-        self.data = []
+        self.class_names: Dict[int, str] = {}
+        self.class_counts = HistogramAccumulator()  # Number of components of each class_id, per split
 
     def update(self, sample: SegmentationSample):
-        for j, class_channel in enumerate(sample.contours):
-            for contour in class_channel:
-                class_id = contour.class_id
-                class_name = sample.class_names[class_id]
-                self.data.append(
-                    {
-                        "split": sample.split,
-                        "class_id": class_id,
-                        "class_name": class_name,
-                    }
-                )
+        if not self.class_names:
+            self.class_names = sample.class_names
+        self.class_counts.add(group=sample.split, values=sample.contours.class_ids)
 
-    def aggregate(self) -> Feature:
-        df = pd.DataFrame(self.data)
+    def state_dict(self) -> Dict[str, Any]:
+        return {"class_names": self.class_names, "class_counts": self.class_counts}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]):
+        self.class_names = dict(state_dict["class_names"])
+        self.class_counts = HistogramAccumulator().merge(state_dict["class_counts"])
 
+    def merge(self, other: "SegmentationClassFrequency") -> "SegmentationClassFrequency":
+        self._check_can_merge(other)
+        other_state = other.state_dict()
+        if not self.class_names:
+            self.class_names = dict(other_state["class_names"])
+        self.class_counts.merge(other_state["class_counts"])
+        return self
+
+    def aggregate(self) -> Feature:
         # Include ("class_name", "class_id", "split", "n_appearance")
-        df_class_count = df.groupby(["class_name", "class_id", "split"]).size().reset_index(name="n_appearance")
+        df_class_count = pd.DataFrame(
+            [
+                {"class_name": self.class_names[class_id], "class_id": class_id, "split": split, "n_appearance": int(n_appearance)}
+                for split in self.class_counts.groups
+                for class_id, n_appearance in enumerate(self.class_counts.counts(split))
+                if n_appearance > 0
+            ]
+        )
+        df_class_count = df_class_count.sort_values(by=["class_name", "class_id", "split"]).reset_index(drop=True)
 
         split_sums = df_class_count.groupby("split")["n_appearance"].sum()
         df_class_count["frequency"] = 100 * (df_class_count["n_appearance"] / df_class_count["split"].map(split_sums))
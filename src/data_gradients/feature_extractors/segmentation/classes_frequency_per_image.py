@@ -1,10 +1,11 @@
-import pandas as pd
+import numpy as np
 
 from data_gradients.common.registry.registry import register_feature_extractor
 from data_gradients.feature_extractors.abstract_feature_extractor import Feature
 from data_gradients.utils.data_classes import SegmentationSample
 from data_gradients.visualize.plot_options import ViolinPlotOptions
 from data_gradients.feature_extractors.abstract_feature_extractor import AbstractFeatureExtractor
+from data_gradients.feature_extractors.accumulators import ColumnarAccumulator, CATEGORY
 from data_gradients.feature_extractors.utils import MostImportantValuesSelector
 
 
@@ -29,25 +30,19 @@ class SegmentationClassesPerImageCount(AbstractFeatureExtractor):
                 - 'min_max':        Returns the (top k)/2 rows with the biggest average values, and the (top k)/2 with the smallest average values.
         """
         self.value_extractor = MostImportantValuesSelector(topk=topk, prioritization_mode=prioritization_mode)
-        self.data = []
+        self.data = ColumnarAccumulator(columns={"split": CATEGORY, "sample_id": object, "class_name": CATEGORY, "class_id": np.int64})
 
     def update(self, sample: SegmentationSample):
-
-        for j, class_channel in enumerate(sample.contours):
-            for contour in class_channel:
-                class_id = contour.class_id
-                class_name = sample.class_names[class_id]
-                self.data.append(
-                    {
-                        "split": sample.split,
-                        "sample_id": sample.sample_id,
-                        "class_name": class_name,
-                        "class_id": class_id,
-                    }
-                )
+        class_ids = sample.contours.class_ids
+        self.data.extend(
+            split=sample.split,
+            sample_id=sample.sample_id,
+            class_name=[sample.class_names[class_id] for class_id in class_ids],
+            class_id=class_ids,
+        )
 
     def aggregate(self) -> Feature:
-        df = pd.DataFrame(self.data)
+        df = self.data.to_dataframe()
 
         # Include ("class_name", "class_id", "split", "n_appearance")
         # For each class, image, split, I want to know how many bbox I have
@@ -1,11 +1,9 @@
 from typing import Tuple, Optional
-import cv2
 import numpy as np
 from data_gradients.common.registry.registry import register_feature_extractor
-from data_gradients.utils.image_processing import resize_in_chunks
+from data_gradients.utils.image_processing import resize_categorical_mask
 from data_gradients.utils.data_classes import SegmentationSample
 from data_gradients.feature_extractors.common.heatmap import BaseClassHeatmap
-from data_gradients.utils.segmentation import mask_to_onehot
 
 
 @register_feature_extractor()
@@ -30,17 +28,16 @@ class SegmentationClassHeatmap(BaseClassHeatmap):
         if not self.class_names:
             self.class_names = sample.class_names
 
-        # (H, W) -> (C, H, W)
-        n_classes = np.max(list(sample.class_names.keys()))
-        mask_onehot = mask_to_onehot(mask_categorical=sample.mask, n_classes=n_classes)
-        mask_onehot = mask_onehot.transpose((1, 2, 0))  # H, W, C -> C, H, W
-
-        target_size = self.heatmap_shape[1], self.heatmap_shape[0]
-        resized_masks = resize_in_chunks(img=mask_onehot, size=target_size, interpolation=cv2.INTER_LINEAR).astype(np.uint8)
-        resized_masks = resized_masks.transpose((2, 0, 1))  # H, W, C -> C, H, W
+        # The mask is resized before being split into classes, so that the cost only depends on the heatmap shape (and not on n_classes x H x W).
+        n_classes = max(sample.class_names.keys()) + 1
+        resized_mask = resize_categorical_mask(mask=sample.mask, shape=self.heatmap_shape)
+        rows, cols = np.nonzero((resized_mask >= 0) & (resized_mask < n_classes))  # Values outside of the classes (e.g. ignore label) are skipped
 
         split_heatmap = self.heatmaps_per_split.get(sample.split, np.zeros((n_classes, *self.heatmap_shape)))
-        split_heatmap += resized_masks
+        if len(split_heatmap) < n_classes:
+            split_heatmap = np.concatenate([split_heatmap, np.zeros((n_classes - len(split_heatmap), *self.heatmap_shape), dtype=split_heatmap.dtype)])
+        # Every (row, col) appears once, so the indices are unique and a fancy indexing increment is enough.
+        split_heatmap[resized_mask[rows, cols], rows, cols] += 1
         self.heatmaps_per_split[sample.split] = split_heatmap
 
     def _generate_title(self) -> str:
@@ -1,4 +1,4 @@
-import pandas as pd
+import numpy as np
 
 from data_gradients.common.registry.registry import register_feature_extractor
 from data_gradients.feature_extractors.abstract_feature_extractor import Feature
@@ -6,6 +6,7 @@ from data_gradients.utils.common import LABELS_PALETTE
 from data_gradients.utils.data_classes import SegmentationSample
 from data_gradients.visualize.plot_options import Hist2DPlotOptions
 from data_gradients.feature_extractors.abstract_feature_extractor import AbstractFeatureExtractor
+from data_gradients.feature_extractors.accumulators import ColumnarAccumulator, CATEGORY
 
 
 @register_feature_extractor()
@@ -21,20 +22,14 @@ class SegmentationComponentsPerImageCount(AbstractFeatureExtractor):
     """
 
     def __init__(self):
-        self.data = []
+        self.data = ColumnarAccumulator(columns={"split": CATEGORY, "sample_id": object, "n_components": np.int64})
 
     def update(self, sample: SegmentationSample):
-        for j, class_channel in enumerate(sample.contours):
-            self.data.append(
-                {
-                    "split": sample.split,
-                    "sample_id": sample.sample_id,
-                    "n_components": len(class_channel),
-                }
-            )
+        _, n_components_per_class = sample.contours.count_per_class()
+        self.data.extend(split=sample.split, sample_id=sample.sample_id, n_components=n_components_per_class)
 
     def aggregate(self) -> Feature:
-        df = pd.DataFrame(self.data)
+        df = self.data.to_dataframe()
 
         plot_options = Hist2DPlotOptions(
             x_label_key="n_components",
@@ -1,11 +1,11 @@
-import pandas as pd
+import numpy as np
 
 from data_gradients.common.registry.registry import register_feature_extractor
 from data_gradients.feature_extractors.abstract_feature_extractor import Feature
 from data_gradients.utils.data_classes import SegmentationSample
 from data_gradients.visualize.seaborn_renderer import KDEPlotOptions
 from data_gradients.feature_extractors.abstract_feature_extractor import AbstractFeatureExtractor
-from data_gradients.sample_preprocessor.utils import contours
+from data_gradients.feature_extractors.accumulators import ColumnarAccumulator, CATEGORY
 
 
 @register_feature_extractor()
@@ -17,23 +17,15 @@ class SegmentationComponentsConvexity(AbstractFeatureExtractor):
     """
 
     def __init__(self):
-        self.data = []
+        self.data = ColumnarAccumulator(columns={"split": CATEGORY, "convexity_measure": np.float64})
 
     def update(self, sample: SegmentationSample):
-        for j, class_channel in enumerate(sample.contours):
-            for contour in class_channel:
-                convex_hull = contours.get_convex_hull(contour)
-                convex_hull_perimeter = contours.get_contour_perimeter(convex_hull)
-                convexity_measure = (contour.perimeter - convex_hull_perimeter) / contour.perimeter
-                self.data.append(
-                    {
-                        "split": sample.split,
-                        "convexity_measure": convexity_measure,
-                    }
-                )
+        contours = sample.contours
+        convexity_measure = (contours.perimeters - contours.convex_hull_perimeters) / contours.perimeters
+        self.data.extend(split=sample.split, convexity_measure=convexity_measure)
 
     def aggregate(self) -> Feature:
-        df = pd.DataFrame(self.data)
+        df = self.data.to_dataframe()
 
         plot_options = KDEPlotOptions(
             x_label_key="convexity_measure",
@@ -34,9 +34,9 @@ class SegmentationComponentsErosion(AbstractFeatureExtractor):
 
         contours_after_opening = contours.get_contours(label=opened_categorical_mask, class_ids=list(sample.class_names.keys()))
 
-        if sample.contours:
-            n_components_without_opening = sum(1 for class_channel in sample.contours for _contour in class_channel)
-            n_components_after_opening = sum(1 for class_channel in contours_after_opening for _contour in class_channel)
+        if len(sample.contours):
+            n_components_without_opening = len(sample.contours)
+            n_components_after_opening = len(contours_after_opening)
 
             increase_of_n_components = n_components_after_opening - n_components_without_opening
             percent_change_of_n_components = 100 * (increase_of_n_components / n_components_without_opening)
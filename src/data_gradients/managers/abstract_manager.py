@@ -1,8 +1,10 @@
 import os
 import abc
+import time
+import pickle
 import logging
 import traceback
-from typing import List, Dict, Optional, Iterable, Sized
+from typing import List, Dict, Optional, Iterable, Sized, Union, Type, Any
 from itertools import zip_longest
 from logging import getLogger
 
@@ -11,6 +13,7 @@ from tqdm import tqdm
 from data_gradients.dataset_adapters.config.typing_utils import SupportedDataType
 from data_gradients.feature_extractors import AbstractFeatureExtractor
 from data_gradients.feature_extractors.common import SummaryStats
+from data_gradients.managers.executors import FeatureExtractorsExecutor, get_executor
 from data_gradients.utils.utils import print_in_box
 from data_gradients.visualize.seaborn_renderer import SeabornRenderer
 from data_gradients.utils.pdf_writer import ResultsContainer, Section, FeatureSummary
@@ -37,6 +40,10 @@ class AnalysisManagerAbstract(abc.ABC):
         grouped_feature_extractors: Dict[str, List[AbstractFeatureExtractor]],
         batches_early_stop: Optional[int] = None,
         remove_plots_after_report: Optional[bool] = True,
+        executor: Union[str, Type[FeatureExtractorsExecutor]] = "serial",
+        n_workers: Optional[int] = None,
+        resume: bool = False,
+        checkpoint_interval: Optional[float] = 600,
     ):
         """
         :param train_data:                  Iterable object contains images and labels of the training dataset
@@ -44,6 +51,11 @@ class AnalysisManagerAbstract(abc.ABC):
         :param grouped_feature_extractors:  List of feature extractors to be used
         :param batches_early_stop:          Maximum number of batches to run in training (early stop)
         :param remove_plots_after_report:   Delete the plots from the report directory after the report is generated. By default, True
+        :param executor:                    How to run the feature extractors. "serial", "thread", "process" or a subclass of FeatureExtractorsExecutor.
+        :param n_workers:                   Number of workers used by the executor. By default, one per feature extractor (up to the number of CPUs).
+        :param resume:                      If True and a checkpoint exists in the log directory, resume the analysis from it instead of starting over.
+                                            The datasets/dataloaders should be the same (and iterated in the same order) as in the checkpointed run.
+        :param checkpoint_interval:         Minimum time (in seconds) between two checkpoints of the analysis, saved in the log directory. None to disable.
         """
 
         self.renderer = SeabornRenderer()
@@ -59,24 +71,35 @@ class AnalysisManagerAbstract(abc.ABC):
         self.train_size = len(train_data) if isinstance(train_data, Sized) else None
         self.val_size = len(val_data) if isinstance(val_data, Sized) else None
 
-        self.train_samples_iterator = sample_preprocessor.preprocess_samples(train_data, split="train")
-        self.val_samples_iterator = sample_preprocessor.preprocess_samples(val_data, split="val")
-
         # FEATURES
         self.grouped_feature_extractors = grouped_feature_extractors
         self._remove_plots_after_report = remove_plots_after_report
         for _, grouped_feature_list in self.grouped_feature_extractors.items():
             for feature_extractor in grouped_feature_list:
                 feature_extractor.setup_data_sources(train_data, val_data)
+        self._n_iterations_done = 0
         self._train_iters_done = 0
         self._val_iters_done = 0
         self._train_batch_size = None
         self._val_batch_size = None
         self._stopped_early = None
 
+        self.executor = executor
+        self.n_workers = n_workers
+
+        # CHECKPOINTS
+        self.sample_preprocessor = sample_preprocessor
+        self.checkpoint_path = os.path.join(self.summary_writer.log_dir, "checkpoint.pkl")
+        self.checkpoint_interval = checkpoint_interval
+        if resume:
+            self._load_checkpoint()
+
+        self.train_samples_iterator = sample_preprocessor.preprocess_samples(train_data, split="train", n_samples_to_skip=self._train_iters_done)
+        self.val_samples_iterator = sample_preprocessor.preprocess_samples(val_data, split="val", n_samples_to_skip=self._val_iters_done)
+
     def execute(self):
         """
-        Execute method take batch from train & val data iterables, submit a thread to it and runs the extractors.
+        Execute method take batch from train & val data iterables, and submit it to the executor that runs the extractors.
         Method finish it work after both train & val iterables are exhausted.
         """
 
@@ -87,7 +110,8 @@ class AnalysisManagerAbstract(abc.ABC):
             f"  - len(val_data): {self.val_size} \n"
             f"  - log directory: {self.summary_writer.log_dir} \n"
             f"  - Archive directory: {self.summary_writer.archive_dir} \n"
-            f"  - feature extractor list: {self.grouped_feature_extractors}"
+            f"  - feature extractor list: {self.grouped_feature_extractors} \n"
+            f"  - executor: {self.executor}"
         )
 
         print_in_box(
@@ -99,34 +123,85 @@ class AnalysisManagerAbstract(abc.ABC):
             zip_longest(self.train_samples_iterator, self.val_samples_iterator, fillvalue=None),
             desc="Analyzing... ",
             total=self.n_batches,
+            initial=self._n_iterations_done,
         )
 
-        self._train_iters_done, self._val_iters_done = 0, 0
         self._stopped_early = False
 
-        for i, (train_sample, val_sample) in enumerate(datasets_tqdm):
+        last_checkpoint_time = time.monotonic()
+        with get_executor(executor=self.executor, feature_extractors=self.feature_extractors, n_workers=self.n_workers) as executor:
+            for i, (train_sample, val_sample) in enumerate(datasets_tqdm, start=self._n_iterations_done):
+
+                if i == self.batches_early_stop:
+                    self._stopped_early = True
+                    break
 
-            if i == self.batches_early_stop:
-                self._stopped_early = True
-                break
+                if train_sample is not None:
+                    executor.submit(train_sample)
+                    self._train_iters_done += 1
 
-            if train_sample is not None:
-                for feature_extractors in self.grouped_feature_extractors.values():
-                    for feature_extractor in feature_extractors:
-                        feature_extractor.update(train_sample)
-                self._train_iters_done += 1
+                if self._train_batch_size is None:
+                    self._train_batch_size = self._train_iters_done
 
-            if self._train_batch_size is None:
-                self._train_batch_size = self._train_iters_done
+                if val_sample is not None:
+                    executor.submit(val_sample)
+                    self._val_iters_done += 1
 
-            if val_sample is not None:
-                for feature_extractors in self.grouped_feature_extractors.values():
-                    for feature_extractor in feature_extractors:
-                        feature_extractor.update(val_sample)
-                self._val_iters_done += 1
+                if self._val_batch_size is None:
+                    self._val_batch_size = self._val_iters_done
 
-            if self._val_batch_size is None:
-                self._val_batch_size = self._val_iters_done
+                self._n_iterations_done = i + 1
+                if self.checkpoint_interval is not None and time.monotonic() - last_checkpoint_time >= self.checkpoint_interval:
+                    self._save_checkpoint(state_dicts=executor.get_state_dicts())
+                    last_checkpoint_time = time.monotonic()
+
+    @property
+    def feature_extractors(self) -> List[AbstractFeatureExtractor]:
+        return [feature_extractor for feature_extractors in self.grouped_feature_extractors.values() for feature_extractor in feature_extractors]
+
+    def _save_checkpoint(self, state_dicts: List[Dict[str, Any]]):
+        """Save the state of the analysis, so that it can be resumed with `resume=True` if the run is interrupted."""
+        checkpoint = {
+            "feature_extractors": [repr(feature_extractor) for feature_extractor in self.feature_extractors],
+            "state_dicts": state_dicts,
+            "n_iterations_done": self._n_iterations_done,
+            "train_iters_done": self._train_iters_done,
+            "val_iters_done": self._val_iters_done,
+            "train_batch_size": self._train_batch_size,
+            "val_batch_size": self._val_batch_size,
+            "one_sample_per_item": dict(self.sample_preprocessor.one_sample_per_item),
+        }
+        tmp_path = self.checkpoint_path + ".tmp"  # Written then renamed, so that an interruption never leaves a partial checkpoint.
+        with open(tmp_path, "wb") as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _load_checkpoint(self):
+        """Load the state of the analysis saved in the log directory, if any."""
+        if not os.path.exists(self.checkpoint_path):
+            logger.info(f"`resume=True` but no checkpoint was found at {self.checkpoint_path}. Starting the analysis from the beginning.")
+            return
+
+        with open(self.checkpoint_path, "rb") as f:
+            checkpoint = pickle.load(f)
+
+        feature_extractor_names = [repr(feature_extractor) for feature_extractor in self.feature_extractors]
+        if checkpoint["feature_extractors"] != feature_extractor_names:
+            raise ValueError(
+                f"The checkpoint at {self.checkpoint_path} was saved with the feature extractors {checkpoint['feature_extractors']}, "
+                f"which does not match the current feature extractors {feature_extractor_names}. Remove it or use `resume=False` to start over."
+            )
+
+        for feature_extractor, state_dict in zip(self.feature_extractors, checkpoint["state_dicts"]):
+            feature_extractor.load_state_dict(state_dict)
+        self._n_iterations_done = checkpoint["n_iterations_done"]
+        self._train_iters_done, self._val_iters_done = checkpoint["train_iters_done"], checkpoint["val_iters_done"]
+        self._train_batch_size, self._val_batch_size = checkpoint["train_batch_size"], checkpoint["val_batch_size"]
+        self.sample_preprocessor.one_sample_per_item.update(checkpoint["one_sample_per_item"])
+        logger.info(
+            f"Resuming the analysis from {self.checkpoint_path}: "
+            f"{self._train_iters_done} train and {self._val_iters_done} validation samples were already analyzed."
+        )
 
     def post_process(self, interrupted=False):
         """
@@ -211,6 +286,9 @@ class AnalysisManagerAbstract(abc.ABC):
             interrupted = e is not None
         self.post_process(interrupted=interrupted)
 
+        if not interrupted and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)  # The analysis is complete, so there is nothing left to resume.
+
         self.data_config.dump_cache_file()
 
         self.print_summary()
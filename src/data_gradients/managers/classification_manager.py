@@ -1,5 +1,5 @@
 import os
-from typing import Optional, Iterable, Callable, List, Union, Dict
+from typing import Optional, Iterable, Callable, List, Union, Dict, Type
 
 import torch
 
@@ -7,6 +7,7 @@ from data_gradients.dataset_adapters.config.data_config import get_default_cache
 from data_gradients.dataset_adapters.config.typing_utils import SupportedDataType, FeatureExtractorsType
 from data_gradients.config.utils import get_grouped_feature_extractors
 from data_gradients.managers.abstract_manager import AnalysisManagerAbstract
+from data_gradients.managers.executors import FeatureExtractorsExecutor
 from data_gradients.utils.summary_writer import SummaryWriter
 from data_gradients.sample_preprocessor.classification_sample_preprocessor import ClassificationSamplePreprocessor
 from data_gradients.dataset_adapters.config.data_config import ClassificationDataConfig
@@ -39,6 +40,10 @@ class ClassificationAnalysisManager(AnalysisManagerAbstract):
         image_format: Optional[ImageFormat] = None,
         batches_early_stop: Optional[int] = None,
         remove_plots_after_report: Optional[bool] = True,
+        executor: Union[str, Type[FeatureExtractorsExecutor]] = "serial",
+        n_workers: Optional[int] = None,
+        resume: bool = False,
+        checkpoint_interval: Optional[float] = 600,
     ):
         """
         Constructor of detection manager which controls the analyzer
@@ -61,6 +66,11 @@ class ClassificationAnalysisManager(AnalysisManagerAbstract):
         :param labels_extractor:        Function extracting the label(s) out of the data output.
         :param image_channels:          Image channels to use.
         :param remove_plots_after_report:  Delete the plots from the report directory after the report is generated. By default, True
+        :param executor:                   How to run the feature extractors. "serial", "thread", "process" or a subclass of FeatureExtractorsExecutor.
+        :param n_workers:                  Number of workers used by the executor. By default, one per feature extractor (up to the number of CPUs).
+        :param resume:                     If True and a checkpoint exists in `log_dir`, resume the analysis from it instead of starting over.
+                                           The data should be the same (and iterated in the same order) as in the checkpointed run.
+        :param checkpoint_interval:        Minimum time (in seconds) between two checkpoints of the analysis, saved in `log_dir`. None to disable.
         """
 
         if feature_extractors is not None and config_path is not None:
@@ -92,4 +102,8 @@ class ClassificationAnalysisManager(AnalysisManagerAbstract):
             grouped_feature_extractors=grouped_feature_extractors,
             batches_early_stop=batches_early_stop,
             remove_plots_after_report=remove_plots_after_report,
+            executor=executor,
+            n_workers=n_workers,
+            resume=resume,
+            checkpoint_interval=checkpoint_interval,
         )
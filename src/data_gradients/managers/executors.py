@@ -0,0 +1,257 @@
+import os
+import abc
+import queue
+import signal
+import threading
+import traceback
+import multiprocessing
+from typing import List, Optional, Sequence, Union, Type, Dict, Any
+
+from data_gradients.feature_extractors import AbstractFeatureExtractor
+from data_gradients.utils.data_classes.data_samples import ImageSample
+
+
+class _StopSignal:
+    """Sent to the workers to signal that no more samples will be submitted. Compared by type, so that it survives pickling."""
+
+
+class _StateRequest:
+    """Sent to the worker processes to ask for the current state of their feature extractors, once the samples submitted before are processed."""
+
+
+class FeatureExtractorsExecutor(abc.ABC):
+    """Run `feature_extractor.update(sample)` for every submitted sample, on every feature extractor.
+
+    Every feature extractor always receives the samples in the order they were submitted,
+    so that the accumulated results are the same whatever executor is used.
+    """
+
+    def __init__(self, feature_extractors: Sequence[AbstractFeatureExtractor], n_workers: Optional[int] = None, max_queue_size: int = 32):
+        """
+        :param feature_extractors:  Feature extractors to update.
+        :param n_workers:           Number of workers to use. By default, one per feature extractor (up to the number of CPUs).
+        :param max_queue_size:      Maximum number of samples that can be waiting for a worker. When reached, `submit` blocks (backpressure).
+        """
+        self.feature_extractors = list(feature_extractors)
+        self.n_workers = n_workers or min(len(self.feature_extractors), os.cpu_count() or 1) or 1
+        self.max_queue_size = max_queue_size
+
+    @abc.abstractmethod
+    def submit(self, sample: ImageSample):
+        """Send a sample to all the feature extractors."""
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def get_state_dicts(self) -> List[Dict[str, Any]]:
+        """Wait until all the submitted samples were processed, and return the state of every feature extractor (in the order they were given).
+        This is used to checkpoint the analysis while it is running.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def close(self):
+        """Wait until all the submitted samples were processed by all the feature extractors, and release the workers."""
+        raise NotImplementedError()
+
+    def _split_into_lanes(self, feature_extractors: List[AbstractFeatureExtractor]) -> List[List[AbstractFeatureExtractor]]:
+        """Distribute the feature extractors over `n_workers` lanes. Each feature extractor is owned by exactly one lane."""
+        n_lanes = min(self.n_workers, len(feature_extractors))
+        return [feature_extractors[i::n_lanes] for i in range(n_lanes)]
+
+    def __enter__(self) -> "FeatureExtractorsExecutor":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SerialExecutor(FeatureExtractorsExecutor):
+    """Update all the feature extractors one after the other, in the calling thread."""
+
+    def submit(self, sample: ImageSample):
+        for feature_extractor in self.feature_extractors:
+            feature_extractor.update(sample)
+
+    def get_state_dicts(self) -> List[Dict[str, Any]]:
+        return [feature_extractor.state_dict() for feature_extractor in self.feature_extractors]
+
+    def close(self):
+        pass
+
+
+class _ThreadLane:
+    """Worker thread owning a subset of the feature extractors, and updating them in the order samples are received."""
+
+    def __init__(self, feature_extractors: List[AbstractFeatureExtractor], max_queue_size: int):
+        self.feature_extractors = feature_extractors
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.error: Optional[BaseException] = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            sample = self.queue.get()
+            if isinstance(sample, _StopSignal):
+                self.queue.task_done()
+                return
+            if self.error is None:  # Otherwise, keep consuming, so that the producer is never blocked on a full queue.
+                try:
+                    for feature_extractor in self.feature_extractors:
+                        feature_extractor.update(sample)
+                except BaseException as e:
+                    self.error = e
+            self.queue.task_done()
+
+
+class ThreadExecutor(FeatureExtractorsExecutor):
+    """Update the feature extractors concurrently, each feature extractor being owned by one worker thread.
+
+    Feature extractors that are not `thread_safe` are updated in the calling thread.
+    """
+
+    def __init__(self, feature_extractors: Sequence[AbstractFeatureExtractor], n_workers: Optional[int] = None, max_queue_size: int = 32):
+        super().__init__(feature_extractors=feature_extractors, n_workers=n_workers, max_queue_size=max_queue_size)
+        threaded_extractors = [feature_extractor for feature_extractor in self.feature_extractors if feature_extractor.thread_safe]
+        self.main_thread_extractors = [feature_extractor for feature_extractor in self.feature_extractors if not feature_extractor.thread_safe]
+        self.lanes = [_ThreadLane(feature_extractors=lane, max_queue_size=max_queue_size) for lane in self._split_into_lanes(threaded_extractors)]
+        self._closed = False
+
+    def submit(self, sample: ImageSample):
+        self._raise_if_failed()
+        for lane in self.lanes:
+            lane.queue.put(sample)
+        for feature_extractor in self.main_thread_extractors:
+            feature_extractor.update(sample)
+
+    def get_state_dicts(self) -> List[Dict[str, Any]]:
+        for lane in self.lanes:
+            lane.queue.join()
+        self._raise_if_failed()
+        return [feature_extractor.state_dict() for feature_extractor in self.feature_extractors]
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for lane in self.lanes:
+            lane.queue.put(_StopSignal())
+        for lane in self.lanes:
+            lane.thread.join()
+        self._raise_if_failed()
+
+    def _raise_if_failed(self):
+        for lane in self.lanes:
+            if lane.error is not None:
+                raise lane.error
+
+
+def _process_lane_worker(feature_extractors: List[AbstractFeatureExtractor], input_queue: multiprocessing.Queue, output_queue: multiprocessing.Queue):
+    """Entry point of the worker processes. Updates its own copy of the feature extractors, and sends their states back once done."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Interruptions are handled by the main process, which will ask the workers to stop.
+    error = None
+    while True:
+        sample = input_queue.get()
+        if isinstance(sample, _StopSignal):
+            break
+        if isinstance(sample, _StateRequest):
+            output_queue.put((error, [feature_extractor.state_dict() for feature_extractor in feature_extractors] if error is None else None))
+            continue
+        if error is not None:
+            continue
+        try:
+            for feature_extractor in feature_extractors:
+                feature_extractor.update(sample)
+        except Exception:
+            error = traceback.format_exc()
+    output_queue.put((error, [feature_extractor.state_dict() for feature_extractor in feature_extractors] if error is None else None))
+
+
+class ProcessExecutor(FeatureExtractorsExecutor):
+    """Update the feature extractors concurrently in worker processes, avoiding the GIL.
+
+    Each worker process holds its own copy of the feature extractors it owns (process-local state).
+    When closing, the accumulated state (`state_dict`) is sent back and loaded into the original feature extractors.
+    The samples and the feature extractors need to be picklable.
+    """
+
+    def __init__(self, feature_extractors: Sequence[AbstractFeatureExtractor], n_workers: Optional[int] = None, max_queue_size: int = 32):
+        super().__init__(feature_extractors=feature_extractors, n_workers=n_workers, max_queue_size=max_queue_size)
+        context = multiprocessing.get_context()
+        self.lanes = []
+        for lane_extractors in self._split_into_lanes(self.feature_extractors):
+            input_queue, output_queue = context.Queue(maxsize=max_queue_size), context.Queue()
+            process = context.Process(target=_process_lane_worker, args=(lane_extractors, input_queue, output_queue), daemon=True)
+            process.start()
+            self.lanes.append((lane_extractors, input_queue, output_queue, process))
+        self._closed = False
+
+    def submit(self, sample: ImageSample):
+        for _, input_queue, _, process in self.lanes:
+            if not process.is_alive():
+                raise RuntimeError(f"Feature extractor worker process {process.pid} died unexpectedly (exitcode={process.exitcode}).")
+            input_queue.put(sample)
+
+    def get_state_dicts(self) -> List[Dict[str, Any]]:
+        for _, input_queue, _, _ in self.lanes:
+            input_queue.put(_StateRequest())
+
+        state_dict_per_extractor, errors = {}, []
+        for lane_extractors, _, output_queue, _ in self.lanes:
+            error, state_dicts = output_queue.get()
+            if error is not None:
+                errors.append(error)
+                continue
+            for feature_extractor, state_dict in zip(lane_extractors, state_dicts):
+                state_dict_per_extractor[id(feature_extractor)] = state_dict
+
+        if errors:
+            raise RuntimeError("Feature extraction failed in a worker process:\n" + "\n".join(errors))
+        return [state_dict_per_extractor[id(feature_extractor)] for feature_extractor in self.feature_extractors]
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+
+        for _, input_queue, _, _ in self.lanes:
+            input_queue.put(_StopSignal())
+
+        errors = []
+        for lane_extractors, _, output_queue, process in self.lanes:
+            error, state_dicts = output_queue.get()  # Read before joining, otherwise the worker may block on a full pipe.
+            process.join()
+            if error is not None:
+                errors.append(error)
+                continue
+            for feature_extractor, state_dict in zip(lane_extractors, state_dicts):
+                feature_extractor.load_state_dict(state_dict)
+
+        if errors:
+            raise RuntimeError("Feature extraction failed in a worker process:\n" + "\n".join(errors))
+
+
+EXECUTORS: Dict[str, Type[FeatureExtractorsExecutor]] = {
+    "serial": SerialExecutor,
+    "thread": ThreadExecutor,
+    "process": ProcessExecutor,
+}
+
+
+def get_executor(
+    executor: Union[str, Type[FeatureExtractorsExecutor]],
+    feature_extractors: Sequence[AbstractFeatureExtractor],
+    n_workers: Optional[int] = None,
+) -> FeatureExtractorsExecutor:
+    """Instantiate the executor used to run the feature extractors.
+
+    :param executor:            Name of the executor ("serial", "thread" or "process"), or a subclass of `FeatureExtractorsExecutor`.
+    :param feature_extractors:  Feature extractors to run.
+    :param n_workers:           Number of workers. Ignored by the serial executor.
+    :return:                    Executor instance.
+    """
+    if isinstance(executor, str):
+        if executor not in EXECUTORS:
+            raise ValueError(f"`executor={executor}` is not supported. Should be one of {list(EXECUTORS.keys())}, or a subclass of FeatureExtractorsExecutor.")
+        executor = EXECUTORS[executor]
+    return executor(feature_extractors=feature_extractors, n_workers=n_workers)
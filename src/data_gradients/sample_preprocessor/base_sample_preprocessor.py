@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import Iterator, Iterable
+from typing import Iterator, Iterable, Dict, Tuple, Any, Sized
 
 from data_gradients.utils.data_classes import ImageSample
+from data_gradients.utils.data_classes.data_samples import Image
 from data_gradients.dataset_adapters.config.typing_utils import SupportedDataType
 from data_gradients.dataset_adapters.config.data_config import DataConfig
+from data_gradients.dataset_adapters.base_adapter import BaseDatasetAdapter
 
 
 class AbstractSamplePreprocessor(ABC):
@@ -12,20 +14,59 @@ class AbstractSamplePreprocessor(ABC):
     This class it the connector between users data and the feature extracting processes as it ensures that
     all the data passed to these feature extractor are of the same known format.
 
-    :attr data_config: Configuration of the data adapter.
+    :attr data_config:          Configuration of the data adapter.
+    :attr one_sample_per_item:  For each split, whether every item of the dataset/dataloader contained exactly one sample so far.
+                                When it is the case, the position of a sample is also its index in the dataset, which allows to skip samples
+                                without loading them.
     """
 
+    adapter: BaseDatasetAdapter  # Set by the subclasses, and used to adapt the items of the datasets/dataloaders.
+
     def __init__(self, data_config: DataConfig):
         """
         :param data_config: Configuration of the data adapter.
         """
         self.data_config = data_config
+        self.one_sample_per_item: Dict[str, bool] = {}
 
     @abstractmethod
-    def preprocess_samples(self, dataset: Iterable[SupportedDataType], split: str) -> Iterator[ImageSample]:
+    def preprocess_samples(self, dataset: Iterable[SupportedDataType], split: str, n_samples_to_skip: int = 0) -> Iterator[ImageSample]:
         """Pre-process the output of a dataset/dataloader into a known sample format.
-        :param dataset: Dataset/dataloader to be processed.
-        :param split:   Split of the dataset/dataloader. ("train", "val", ...)
-        :returns:       Iterator yielding the processed samples of the dataset/dataloader one by one.
+        :param dataset:             Dataset/dataloader to be processed.
+        :param split:               Split of the dataset/dataloader. ("train", "val", ...)
+        :param n_samples_to_skip:   Number of samples to skip at the beginning of the dataset/dataloader (e.g. because they were already analyzed).
+        :returns:                   Iterator yielding the processed samples of the dataset/dataloader one by one.
         """
         ...
+
+    def _iterate_images_and_labels(self, dataset: Iterable[SupportedDataType], split: str, n_samples_to_skip: int = 0) -> Iterator[Tuple[str, Image, Any]]:
+        """Adapt every item of a dataset/dataloader, and yield its samples one by one.
+
+        :param dataset:             Dataset/dataloader to be processed.
+        :param split:               Split of the dataset/dataloader. ("train", "val", ...)
+        :param n_samples_to_skip:   Number of samples to skip at the beginning of the dataset/dataloader.
+        :returns:                   Iterator yielding (sample_id, image, label). The sample_id is stable across runs, as it only depends on the split and
+                                    on the position of the sample in the dataset/dataloader.
+        """
+        sample_index = 0
+        if n_samples_to_skip and self.one_sample_per_item.get(split, False) and _is_indexable(dataset):
+            # Each item is a sample, so the first samples do not need to be loaded at all.
+            dataset = (dataset[index] for index in range(n_samples_to_skip, len(dataset)))
+            sample_index = n_samples_to_skip
+        else:
+            self.one_sample_per_item[split] = True
+
+        for data in dataset:
+            images, labels = self.adapter.adapt(data)
+            if len(images) != 1:
+                self.one_sample_per_item[split] = False
+
+            for image, label in zip(images, labels):
+                if sample_index >= n_samples_to_skip:
+                    yield f"{split}_{sample_index}", image, label
+                sample_index += 1
+
+
+def _is_indexable(dataset: Iterable) -> bool:
+    """Whether the dataset is a map-style dataset (e.g. torch Dataset or list), as opposed to a dataloader or any other iterable."""
+    return isinstance(dataset, Sized) and hasattr(dataset, "__getitem__")
@@ -1,5 +1,4 @@
 from typing import Iterable, Iterator
-import time
 
 import numpy as np
 
@@ -16,20 +15,17 @@ class ClassificationSamplePreprocessor(AbstractSamplePreprocessor):
         self.adapter = ClassificationDatasetAdapter(data_config=data_config)
         super().__init__(data_config=self.adapter.data_config)
 
-    def preprocess_samples(self, dataset: Iterable[SupportedDataType], split: str) -> Iterator[ClassificationSample]:
-        for data in dataset:
-            images, labels = self.adapter.adapt(data)
+    def preprocess_samples(self, dataset: Iterable[SupportedDataType], split: str, n_samples_to_skip: int = 0) -> Iterator[ClassificationSample]:
+        for sample_id, image, target in self._iterate_images_and_labels(dataset, split=split, n_samples_to_skip=n_samples_to_skip):
+            class_id = int(target)
 
-            for image, target in zip(images, labels):
-                class_id = int(target)
-
-                # TODO: Abstract the fact the images are channel last/first and add it to the Image class
-                image.data = np.uint8(np.transpose(image.as_numpy(), (1, 2, 0)))
-                sample = ClassificationSample(
-                    image=image,
-                    class_id=class_id,
-                    class_names=self.data_config.get_class_names(),
-                    split=split,
-                    sample_id=str(time.time()),
-                )
-                yield sample
+            # TODO: Abstract the fact the images are channel last/first and add it to the Image class
+            image.data = np.uint8(np.transpose(image.as_numpy(), (1, 2, 0)))
+            sample = ClassificationSample(
+                image=image,
+                class_id=class_id,
+                class_names=self.data_config.get_class_names(),
+                split=split,
+                sample_id=sample_id,
+            )
+            yield sample
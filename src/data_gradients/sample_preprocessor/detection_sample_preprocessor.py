@@ -1,5 +1,4 @@
 from typing import Iterable, Iterator
-import time
 
 import numpy as np
 
@@ -16,21 +15,18 @@ class DetectionSamplePreprocessor(AbstractSamplePreprocessor):
         self.adapter = DetectionDatasetAdapter(data_config=data_config)
         super().__init__(data_config=data_config)
 
-    def preprocess_samples(self, dataset: Iterable[SupportedDataType], split: str) -> Iterator[DetectionSample]:
-        for data in dataset:
-            images, labels = self.adapter.adapt(data)
+    def preprocess_samples(self, dataset: Iterable[SupportedDataType], split: str, n_samples_to_skip: int = 0) -> Iterator[DetectionSample]:
+        for sample_id, image, target in self._iterate_images_and_labels(dataset, split=split, n_samples_to_skip=n_samples_to_skip):
+            target = target.cpu().numpy().astype(int)
+            class_ids, bboxes_xyxy = target[:, 0], target[:, 1:]
 
-            for image, target in zip(images, labels):
-                target = target.cpu().numpy().astype(int)
-                class_ids, bboxes_xyxy = target[:, 0], target[:, 1:]
-
-                # TODO: Abstract the fact the images are channel last/first and add it to the Image class
-                image.data = np.uint8(np.transpose(image.as_numpy(), (1, 2, 0)))
-                yield DetectionSample(
-                    image=image,
-                    class_ids=class_ids,
-                    bboxes_xyxy=bboxes_xyxy,
-                    class_names=self.data_config.get_class_names(),
-                    split=split,
-                    sample_id=str(time.time()),
-                )
+            # TODO: Abstract the fact the images are channel last/first and add it to the Image class
+            image.data = np.uint8(np.transpose(image.as_numpy(), (1, 2, 0)))
+            yield DetectionSample(
+                image=image,
+                class_ids=class_ids,
+                bboxes_xyxy=bboxes_xyxy,
+                class_names=self.data_config.get_class_names(),
+                split=split,
+                sample_id=sample_id,
+            )
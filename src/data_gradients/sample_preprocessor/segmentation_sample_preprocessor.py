@@ -1,5 +1,4 @@
 from typing import Iterable, Iterator
-import time
 
 import numpy as np
 
@@ -17,21 +16,18 @@ class SegmentationSampleProcessor(AbstractSamplePreprocessor):
         self.adapter = SegmentationDatasetAdapter(data_config=data_config, threshold_soft_labels=threshold_soft_labels)
         super().__init__(data_config=self.adapter.data_config)
 
-    def preprocess_samples(self, dataset: Iterable[SupportedDataType], split: str) -> Iterator[SegmentationSample]:
-        for data in dataset:
-            images, labels = self.adapter.adapt(data)
-            labels = np.uint8(labels.cpu().numpy())
+    def preprocess_samples(self, dataset: Iterable[SupportedDataType], split: str, n_samples_to_skip: int = 0) -> Iterator[SegmentationSample]:
+        for sample_id, image, mask in self._iterate_images_and_labels(dataset, split=split, n_samples_to_skip=n_samples_to_skip):
+            mask = np.uint8(mask.cpu().numpy())
+            contours = get_contours(mask, class_ids=list(self.data_config.get_class_names().keys()))
 
-            for image, mask in zip(images, labels):
-                contours = get_contours(mask, class_ids=list(self.data_config.get_class_names().keys()))
-
-                # TODO: Abstract the fact the images are channel last/first and add it to the Image class
-                image.data = np.uint8(np.transpose(image.as_numpy(), (1, 2, 0)))
-                yield SegmentationSample(
-                    image=image,
-                    mask=mask,
-                    contours=contours,
-                    class_names=self.data_config.get_class_names(),
-                    split=split,
-                    sample_id=str(time.time()),
-                )
+            # TODO: Abstract the fact the images are channel last/first and add it to the Image class
+            image.data = np.uint8(np.transpose(image.as_numpy(), (1, 2, 0)))
+            yield SegmentationSample(
+                image=image,
+                mask=mask,
+                contours=contours,
+                class_names=self.data_config.get_class_names(),
+                split=split,
+                sample_id=sample_id,
+            )
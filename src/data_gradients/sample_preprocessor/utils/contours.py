@@ -3,38 +3,63 @@ from typing import List, Tuple, Dict, Sequence
 import cv2
 import numpy as np
 
-from data_gradients.utils.data_classes.contour import Contour
+from data_gradients.utils.data_classes.contour import Contour, ContourSet
 
 
-def get_contours(label: np.ndarray, class_ids: Sequence[int]) -> List[list]:
+def get_contours(label: np.ndarray, class_ids: Sequence[int]) -> ContourSet:
     """
-    Find contours in each class-channel individually, using opencv findContours method
+    Find contours in each class-channel individually, using opencv findContours method.
+
+    The classes present in the mask, and the region that each of them covers, are found in a single pass over the mask.
+    The contours of each class are then only searched within the region of this class.
+
     :param label:       Categorical representation of mask, of shape [H, W]
     :param class_ids:   List of class-ids.
-    :return:            List with the shape [N, Nc, P, 1, 2] where N is number of valid classes, Nc are number of contours
-    per class, P are number of points for each contour and (1, 2) are set of points.
+    :return:            All the valid contours of the mask, grouped by class (in the order of `class_ids`).
     """
 
     # Type to INT8 as for Index array
     label = label.astype(np.uint8, copy=False)
+    height, width = label.shape[:2]
+    class_row_ranges, class_col_ranges = _get_class_ranges(label)
 
     all_onehot_contour = []
 
     for class_channel in class_ids:
-
-        onehot = (label == class_channel).astype(np.uint8)  # Boolean mask of shape [H, W]
-        if np.max(onehot) == 0:
+        if class_channel not in class_row_ranges:
             continue
+
+        # Crop the region covered by the class, with 1 pixel of margin so that contours are the same as if found in the full mask.
+        (y_min, y_max), (x_min, x_max) = class_row_ranges[class_channel], class_col_ranges[class_channel]
+        y_min, y_max, x_min, x_max = max(y_min - 1, 0), min(y_max + 2, height), max(x_min - 1, 0), min(x_max + 2, width)
+        onehot = (label[y_min:y_max, x_min:x_max] == class_channel).astype(np.uint8)  # Boolean mask of shape [h, w]
+
         # Find contours and return shape of [N, P, 1, 2] where N is number of contours and P list of points
-        onehot_contour, _ = cv2.findContours(onehot * 1, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        onehot_contour, _ = cv2.findContours(onehot, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=(x_min, y_min))
         # Check if contour is OK
         valid_onehot_contours = get_valid_contours(onehot_contour, class_channel)
-        if len(valid_onehot_contours):
-            # Attach to the Channel dim to get a [C, N, P, 1, 2] Tensor
-            all_onehot_contour.append(valid_onehot_contours)
+        all_onehot_contour.extend(valid_onehot_contours)
+
+    return ContourSet.from_contours(all_onehot_contour)
 
-    # Return tensor with [N, Nc, P, 1, 2] where N is # of classes, Nc # of contours per class and
-    return all_onehot_contour
+
+def _get_class_ranges(label: np.ndarray) -> Tuple[Dict[int, Tuple[int, int]], Dict[int, Tuple[int, int]]]:
+    """Find the range of rows and the range of columns covered by each class of a uint8 categorical mask, in a single pass per axis.
+
+    :param label:   Categorical mask of shape [H, W], uint8.
+    :return:        (row ranges, column ranges), each mapping the classes present in the mask to their (first, last) row/column.
+    """
+    height, width = label.shape[:2]
+    class_codes = label.astype(np.intp)
+    rows_presence = np.bincount((class_codes * height + np.arange(height)[:, None]).ravel(), minlength=256 * height).reshape(256, height) > 0
+    cols_presence = np.bincount((class_codes * width + np.arange(width)[None, :]).ravel(), minlength=256 * width).reshape(256, width) > 0
+
+    row_ranges, col_ranges = {}, {}
+    for class_id in np.flatnonzero(rows_presence.any(axis=1)):
+        rows, cols = np.flatnonzero(rows_presence[class_id]), np.flatnonzero(cols_presence[class_id])
+        row_ranges[int(class_id)] = (rows[0], rows[-1])
+        col_ranges[int(class_id)] = (cols[0], cols[-1])
+    return row_ranges, col_ranges
 
 
 def get_bbox_area(contour):
@@ -42,32 +67,22 @@ def get_bbox_area(contour):
     return w * h
 
 
-def get_valid_contours(contours: Tuple, class_id: int) -> List:
+def get_valid_contours(contours: Tuple, class_id: int) -> List[Contour]:
     """
     Contours sometimes are buggy, as for 2-points-contour, a stragith line, etc.
-    We'll remove the by the valid - criteria (temporary) - minimal size of (3 ^ 2) pixels
+    We'll remove the by the valid - criteria (temporary) - minimal size of (3 ^ 2) pixels.
+    Only the area (required for this check) and the bounding box are computed here, other properties are computed lazily by `Contour`.
+
     :param contours: Any list of contours
     :return: Valid list of contours
     """
-    # TODO: Get all contours features in a better way then this function
     valid_contours = []
     minimal_contour_size = 9
     for contour in contours:
         contour_area = get_contour_area(contour)
         if contour_area > minimal_contour_size:
-            _, w, h = get_extreme_points(contour)
-            valid_contours += [
-                Contour(
-                    points=contour,
-                    area=contour_area,
-                    center=get_contour_center_of_mass(contour),
-                    perimeter=get_contour_perimeter(contour),
-                    bbox_area=get_bbox_area(contour),
-                    w=w,
-                    h=h,
-                    class_id=class_id,
-                )
-            ]
+            _, _, w, h = cv2.boundingRect(contour)
+            valid_contours.append(Contour(points=contour, area=contour_area, w=w - 1, h=h - 1, class_id=class_id))
     return valid_contours
 
 
@@ -1,4 +1,4 @@
-from data_gradients.utils.data_classes.contour import Contour
+from data_gradients.utils.data_classes.contour import Contour, ContourSet
 from data_gradients.utils.data_classes.data_samples import ImageSample, SegmentationSample, DetectionSample
 
-__all__ = ["Contour", "ImageSample", "SegmentationSample", "DetectionSample"]
+__all__ = ["Contour", "ContourSet", "ImageSample", "SegmentationSample", "DetectionSample"]
@@ -1,16 +1,200 @@
-from dataclasses import dataclass
-from typing import Tuple
+from functools import cached_property
+from typing import Tuple, Optional, Iterable, Iterator
 
+import cv2
 import numpy as np
 
 
-@dataclass()
 class Contour:
-    points: np.array
-    area: float
-    w: float
-    h: float
-    center: Tuple[int, int]
-    perimeter: float
-    class_id: int
-    bbox_area: float
+    """Contour of a connected component of a class in a segmentation mask.
+
+    The geometric properties that are not provided are computed from the points the first time they are accessed, and then cached.
+    """
+
+    def __init__(
+        self,
+        points: np.array,
+        class_id: int,
+        area: Optional[float] = None,
+        w: Optional[float] = None,
+        h: Optional[float] = None,
+        center: Optional[Tuple[int, int]] = None,
+        perimeter: Optional[float] = None,
+        bbox_area: Optional[float] = None,
+    ):
+        """
+        :param points:      Points of the contour, of shape [P, 1, 2], as returned by `cv2.findContours`.
+        :param class_id:    Class of the connected component.
+        :param area:        Area of the contour polygon.
+        :param w:           Width of the contour (distance between its leftmost and rightmost points).
+        :param h:           Height of the contour (distance between its topmost and bottommost points).
+        :param center:      Center of mass of the contour (x, y).
+        :param perimeter:   Perimeter of the contour.
+        :param bbox_area:   Area of the minimal (rotated) rectangle enclosing the contour.
+        """
+        self.points = points
+        self.class_id = class_id
+        self._area = area
+        self._w = w
+        self._h = h
+        self._center = center
+        self._perimeter = perimeter
+        self._bbox_area = bbox_area
+
+    @property
+    def area(self) -> float:
+        if self._area is None:
+            self._area = float(cv2.contourArea(self.points))
+        return self._area
+
+    @property
+    def w(self) -> float:
+        if self._w is None:
+            self._w = int(self.points[..., 0].max() - self.points[..., 0].min())
+        return self._w
+
+    @property
+    def h(self) -> float:
+        if self._h is None:
+            self._h = int(self.points[..., 1].max() - self.points[..., 1].min())
+        return self._h
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        if self._center is None:
+            moments = cv2.moments(self.points)
+            self._center = (-1, -1) if moments["m00"] < 10 else (int(moments["m10"] / moments["m00"]), int(moments["m01"] / moments["m00"]))
+        return self._center
+
+    @center.setter
+    def center(self, center: Tuple[int, int]):
+        self._center = center
+
+    @property
+    def perimeter(self) -> float:
+        if self._perimeter is None:
+            self._perimeter = cv2.arcLength(self.points, closed=True)
+        return self._perimeter
+
+    @property
+    def bbox_area(self) -> float:
+        if self._bbox_area is None:
+            (cx, cy), (w, h), angle = cv2.minAreaRect(self.points)
+            self._bbox_area = w * h
+        return self._bbox_area
+
+    def __repr__(self) -> str:
+        return f"Contour(class_id={self.class_id}, n_points={len(self.points)}, area={self.area})"
+
+
+class ContourSet:
+    """All the contours of a sample, stored as a struct of arrays instead of a list of `Contour` objects.
+
+    The points of all the contours are concatenated in a single buffer, and `offsets[i]:offsets[i + 1]` delimits the points of the i-th contour.
+    Class ids, areas, widths and heights are stored as arrays, so that feature extractors can read them as vectorized columns.
+    The more expensive properties (perimeters, rotated bounding box areas, ...) are only computed if accessed, and then cached.
+
+    Iterating over a ContourSet (or indexing it) returns `Contour` objects, for code that works on individual contours.
+    """
+
+    def __init__(
+        self,
+        points: np.ndarray,
+        offsets: np.ndarray,
+        class_ids: np.ndarray,
+        areas: np.ndarray,
+        widths: np.ndarray,
+        heights: np.ndarray,
+    ):
+        """
+        :param points:      Points of all the contours, concatenated, of shape [P, 2] (x, y).
+        :param offsets:     Start of each contour in `points`, of shape [N + 1]. The last element is P.
+        :param class_ids:   Class of each contour, of shape [N].
+        :param areas:       Area of each contour polygon, of shape [N].
+        :param widths:      Width of each contour (distance between its leftmost and rightmost points), of shape [N].
+        :param heights:     Height of each contour (distance between its topmost and bottommost points), of shape [N].
+        """
+        self.points = points
+        self.offsets = offsets
+        self.class_ids = class_ids
+        self.areas = areas
+        self.widths = widths
+        self.heights = heights
+
+    @classmethod
+    def from_contours(cls, contours: Iterable[Contour]) -> "ContourSet":
+        """Build a ContourSet from a sequence of `Contour`, keeping their order."""
+        contours = list(contours)
+        points = [np.asarray(contour.points, dtype=np.int32).reshape(-1, 2) for contour in contours]
+        contour_set = cls(
+            points=np.concatenate(points) if points else np.zeros((0, 2), dtype=np.int32),
+            offsets=np.concatenate([[0], np.cumsum([len(p) for p in points], dtype=np.int64)]).astype(np.int64),
+            class_ids=np.array([contour.class_id for contour in contours], dtype=np.int64),
+            areas=np.array([contour.area for contour in contours], dtype=np.float64),
+            widths=np.array([contour.w for contour in contours], dtype=np.int32),
+            heights=np.array([contour.h for contour in contours], dtype=np.int32),
+        )
+        # Keep the properties that were already set/computed, instead of computing them again.
+        if all(contour._perimeter is not None for contour in contours):
+            contour_set.__dict__["perimeters"] = np.array([contour.perimeter for contour in contours], dtype=np.float64)
+        if all(contour._bbox_area is not None for contour in contours):
+            contour_set.__dict__["bbox_areas"] = np.array([contour.bbox_area for contour in contours], dtype=np.float64)
+        return contour_set
+
+    @classmethod
+    def empty(cls) -> "ContourSet":
+        return cls.from_contours([])
+
+    def get_points(self, index: int) -> np.ndarray:
+        """Points of the index-th contour, of shape [P, 1, 2] as returned by `cv2.findContours`. This is a view on the points buffer."""
+        return self.points[self.offsets[index] : self.offsets[index + 1]].reshape(-1, 1, 2)
+
+    @cached_property
+    def perimeters(self) -> np.ndarray:
+        return np.array([cv2.arcLength(self.get_points(i), closed=True) for i in range(len(self))], dtype=np.float64)
+
+    @cached_property
+    def bbox_areas(self) -> np.ndarray:
+        """Area of the minimal (rotated) rectangle enclosing each contour."""
+        return np.array([np.prod(cv2.minAreaRect(self.get_points(i))[1]) for i in range(len(self))], dtype=np.float64)
+
+    @cached_property
+    def centers(self) -> np.ndarray:
+        """Center of mass (x, y) of each contour, of shape [N, 2]. (-1, -1) for contours too small to have a reliable center."""
+        return np.array([self[i].center for i in range(len(self))], dtype=np.int64).reshape(-1, 2)
+
+    @cached_property
+    def convex_hull_perimeters(self) -> np.ndarray:
+        return np.array([cv2.arcLength(cv2.convexHull(self.get_points(i), hull=False), closed=True) for i in range(len(self))], dtype=np.float64)
+
+    def count_per_class(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Number of contours of each class present in the set.
+
+        :return: (class_ids, counts), with the classes in the order in which they first appear in the set.
+        """
+        class_ids, first_index, counts = np.unique(self.class_ids, return_index=True, return_counts=True)
+        order = np.argsort(first_index, kind="stable")
+        return class_ids[order], counts[order]
+
+    def __len__(self) -> int:
+        return len(self.class_ids)
+
+    def __getitem__(self, index: int) -> Contour:
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Contour index {index} out of range for a ContourSet of {len(self)} contours.")
+        index = index % len(self)
+        return Contour(
+            points=self.get_points(index),
+            class_id=int(self.class_ids[index]),
+            area=float(self.areas[index]),
+            w=int(self.widths[index]),
+            h=int(self.heights[index]),
+            perimeter=self.__dict__["perimeters"][index] if "perimeters" in self.__dict__ else None,
+            bbox_area=self.__dict__["bbox_areas"][index] if "bbox_areas" in self.__dict__ else None,
+        )
+
+    def __iter__(self) -> Iterator[Contour]:
+        return (self[i] for i in range(len(self)))
+
+    def __repr__(self) -> str:
+        return f"ContourSet(n_contours={len(self)}, n_points={len(self.points)})"
@@ -4,7 +4,7 @@ from typing import List, Dict, Union
 import numpy as np
 import torch
 
-from data_gradients.utils.data_classes.contour import Contour
+from data_gradients.utils.data_classes.contour import ContourSet
 from data_gradients.utils.data_classes.image_channels import ImageChannels
 from data_gradients.dataset_adapters.formatters.utils import ImageFormat, Uint8ImageFormat, FloatImageFormat, ScaledFloatImageFormat
 from dataclasses import dataclass
@@ -92,13 +92,13 @@ class SegmentationSample(ImageSample):
     :attr split:            The name of the dataset split. Could be "train", "val", "test", etc.
     :attr image:            np.ndarray of shape [H,W,C] - The image as a numpy array with channels last.
     :attr mask:             np.ndarray of shape [H, W], categorical representation of the mask.
-    :attr contours:         A list of contours for each class in the mask.
+    :attr contours:         All the contours of the mask, for every class.
     :attr class_names:      List of all class names in the dataset. The index should represent the class_id.
     """
 
     mask: np.ndarray
 
-    contours: List[List[Contour]]
+    contours: ContourSet
     class_names: Dict[int, str]
 
     def __repr__(self):
@@ -24,3 +24,17 @@ def resize_in_chunks(img: np.ndarray, size: Tuple[int, int], interpolation=cv2.I
         chunks.append(resized_chunk)
 
     return np.dstack(chunks)
+
+
+def resize_categorical_mask(mask: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+    """Resize a categorical mask with nearest neighbor interpolation.
+    Unlike resizing its one-hot representation, the cost does not depend on the number of classes, and any dtype is supported.
+
+    :param mask:    Categorical mask, (H, W).
+    :param shape:   The shape to resize to, (H, W).
+    :return: The resized mask, with the same dtype as the input.
+    """
+    height, width = mask.shape[:2]
+    rows = ((np.arange(shape[0]) + 0.5) * (height / shape[0])).astype(np.int64)
+    cols = ((np.arange(shape[1]) + 0.5) * (width / shape[1])).astype(np.int64)
+    return mask[rows[:, np.newaxis], cols[np.newaxis, :]]
@@ -0,0 +1,77 @@
+import pickle
+import unittest
+
+import numpy as np
+
+from data_gradients.feature_extractors.accumulators import CATEGORY, GrowableArray, ColumnarAccumulator, HistogramAccumulator
+
+
+class AccumulatorsTest(unittest.TestCase):
+    def test_growable_array(self):
+        array = GrowableArray(dtype=np.float32, initial_capacity=2)
+        for i in range(5):
+            array.append(i)
+        array.extend(np.arange(5, 100))
+        self.assertEqual(len(array), 100)
+        np.testing.assert_array_equal(array.values, np.arange(100, dtype=np.float32))
+
+        restored = pickle.loads(pickle.dumps(array))
+        np.testing.assert_array_equal(restored.values, array.values)
+        restored.append(100)
+        self.assertEqual(len(restored), 101)
+
+    def test_columnar_accumulator(self):
+        accumulator = ColumnarAccumulator(columns={"split": CATEGORY, "class_id": np.int32, "area": np.float64})
+        accumulator.append(split="train", class_id=1, area=10.5)
+        accumulator.extend(split="val", class_id=np.array([2, 3]), area=np.array([3.0, 4.0]))
+        accumulator.extend(split=np.array(["train", "val"]), class_id=[4, 5], area=[1.0, 2.0])
+
+        df = accumulator.to_dataframe()
+        self.assertEqual(len(accumulator), 5)
+        self.assertEqual(df["split"].tolist(), ["train", "val", "val", "train", "val"])
+        self.assertEqual(df["class_id"].tolist(), [1, 2, 3, 4, 5])
+        self.assertEqual(df["area"].tolist(), [10.5, 3.0, 4.0, 1.0, 2.0])
+
+        with self.assertRaises(ValueError):
+            accumulator.append(split="train", class_id=1)
+
+    def test_columnar_accumulator_merge(self):
+        columns = {"split": CATEGORY, "value": np.float64}
+        first, second = ColumnarAccumulator(columns=columns), ColumnarAccumulator(columns=columns)
+        first.extend(split="train", value=[1.0, 2.0])
+        second.extend(split="val", value=[3.0])
+        second.append(split="train", value=4.0)
+
+        merged = pickle.loads(pickle.dumps(first)).merge(pickle.loads(pickle.dumps(second)))
+        self.assertEqual(merged.to_dataframe()["split"].tolist(), ["train", "train", "val", "train"])
+        self.assertEqual(merged.to_dataframe()["value"].tolist(), [1.0, 2.0, 3.0, 4.0])
+
+        with self.assertRaises(ValueError):
+            first.merge(ColumnarAccumulator(columns={"split": CATEGORY}))
+
+    def test_histogram_accumulator_integer_bins(self):
+        histogram = HistogramAccumulator()
+        histogram.add("train", [0, 2, 2])
+        histogram.add("train", [5])
+        histogram.add("val", [1])
+        np.testing.assert_array_equal(histogram.counts("train"), [1, 0, 2, 0, 0, 1])
+        np.testing.assert_array_equal(histogram.counts("val"), [0, 1])
+        self.assertEqual(len(histogram.counts("test")), 0)
+
+        other = HistogramAccumulator()
+        other.add("val", [3, 1])
+        histogram.merge(pickle.loads(pickle.dumps(other)))
+        np.testing.assert_array_equal(histogram.counts("val"), [0, 2, 0, 1])
+        self.assertEqual(histogram.groups, ["train", "val"])
+
+    def test_histogram_accumulator_edges(self):
+        histogram = HistogramAccumulator(bin_edges=np.linspace(0, 1, 5))
+        histogram.add("train", [-1.0, 0.0, 0.3, 0.5, 0.99, 1.0, 2.0])
+        np.testing.assert_array_equal(histogram.counts("train"), [2, 1, 1, 3])
+
+        with self.assertRaises(ValueError):
+            histogram.merge(HistogramAccumulator(bin_edges=np.linspace(0, 1, 3)))
+
+
+if __name__ == "__main__":
+    unittest.main()
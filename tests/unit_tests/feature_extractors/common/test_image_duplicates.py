@@ -0,0 +1,85 @@
+import unittest
+
+import numpy as np
+
+from data_gradients.feature_extractors import ImageDuplicates
+from data_gradients.feature_extractors.common.image_duplicates import find_duplicate_groups, compute_dhash
+from data_gradients.utils.data_classes.data_samples import ImageSample, Image
+from data_gradients.utils.data_classes.image_channels import ImageChannels
+from data_gradients.dataset_adapters.formatters.utils import Uint8ImageFormat
+
+
+def _make_sample(sample_id: str, split: str, data: np.ndarray, channels: str = "RGB") -> ImageSample:
+    return ImageSample(sample_id=sample_id, split=split, image=Image(data=data, format=Uint8ImageFormat(), channels=ImageChannels.from_str(channels)))
+
+
+class ImageDuplicatesTest(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(seed=0)
+        self.images = [rng.integers(0, 255, size=(64, 80, 3), dtype=np.uint8) for _ in range(5)]
+
+    def test_exact_duplicates(self):
+        extractor = ImageDuplicates()
+        samples = [
+            _make_sample("train_0", "train", self.images[0]),
+            _make_sample("train_1", "train", self.images[0].copy()),
+            _make_sample("train_2", "train", self.images[1]),
+            _make_sample("train_3", "train", self.images[2]),
+            _make_sample("val_0", "val", self.images[2][:, :, ::-1], channels="BGR"),  # Same image, in another color format
+            _make_sample("val_1", "val", self.images[3]),
+            _make_sample("val_2", "val", self.images[4]),
+            _make_sample("val_3", "val", self.images[4]),
+        ]
+        for sample in samples:
+            extractor.update(sample)
+        feature = extractor.aggregate()
+
+        self.assertEqual(feature.json["Train duplicates"], [["train_0", "train_1"]])
+        self.assertEqual(feature.json["Validation duplicates"], [["val_2", "val_3"]])
+        self.assertEqual(feature.json["Intersection duplicates"], [["train_3", "val_0"]])
+        self.assertEqual(extractor.train_dups_appearences, 2)
+        self.assertEqual(extractor.intersection_train_appearnces, 1)
+        self.assertEqual(extractor.intersection_val_appearnces, 1)
+
+    def test_near_duplicates(self):
+        brighter_image = np.clip(self.images[0].astype(int) + 3, 0, 255).astype(np.uint8)
+        brighter_image[:8, :8] = 255  # Local change, that flips a few bits of the hash
+
+        for max_distance, expected in [(0, []), (10, [["train_0", "train_1"]])]:
+            extractor = ImageDuplicates(max_distance=max_distance)
+            extractor.update(_make_sample("train_0", "train", self.images[0]))
+            extractor.update(_make_sample("train_1", "train", brighter_image))
+            extractor.update(_make_sample("train_2", "train", self.images[1]))
+            if max_distance == 0:
+                self.assertNotEqual(compute_dhash(self.images[0]), compute_dhash(brighter_image))
+            self.assertEqual(extractor.aggregate().json["Train duplicates"], expected)
+
+    def test_merge(self):
+        first, second = ImageDuplicates(), ImageDuplicates()
+        first.update(_make_sample("train_0", "train", self.images[0]))
+        second.update(_make_sample("val_0", "val", self.images[0]))
+        merged = ImageDuplicates.from_state(first.state_dict()).merge(second)
+        self.assertEqual(merged.aggregate().json["Intersection duplicates"], [["train_0", "val_0"]])
+
+    def test_find_duplicate_groups_matches_brute_force(self):
+        rng = np.random.default_rng(seed=1)
+        hashes = rng.integers(0, 2**63, size=50, dtype=np.uint64)
+        # Add near copies of a few hashes, with a few flipped bits.
+        for i in range(10):
+            flipped_bits = rng.choice(64, size=i % 4, replace=False).astype(np.uint64)
+            hashes = np.append(hashes, hashes[i] ^ np.bitwise_or.reduce(np.uint64(1) << flipped_bits, initial=np.uint64(0)))
+
+        for max_distance in [0, 1, 3]:
+            distances = np.array([[bin(int(a) ^ int(b)).count("1") for b in hashes] for a in hashes])
+            # Connected components of the brute force graph
+            labels = np.arange(len(hashes))
+            for _ in range(len(hashes)):
+                labels = np.array([labels[distances[i] <= max_distance].min() for i in range(len(hashes))])
+            expected = sorted(sorted(np.flatnonzero(labels == label).tolist()) for label in np.unique(labels) if (labels == label).sum() > 1)
+
+            result = sorted(sorted(group) for group in find_duplicate_groups(hashes, max_distance=max_distance))
+            self.assertEqual(result, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,8 @@ import random
 import unittest
 
 import numpy as np
+import torch
+from torchvision.ops import box_iou
 
 from data_gradients.feature_extractors.object_detection.bounding_boxes_iou import DetectionBoundingBoxIoU
 from data_gradients.utils.data_classes.data_samples import DetectionSample, Image
@@ -101,6 +103,28 @@ class BoundingBoxesIoUTest(unittest.TestCase):
         f.savefig("test_plot_16_classes.png")
         f.show()
 
+    def test_counts_match_pairwise_iou(self):
+        samples = self.generate_random_dataset(num_classes=5, num_samples=50, average_number_of_bboxes_per_sample=10)
+        num_bins = 10
+
+        extractor = DetectionBoundingBoxIoU(num_bins=num_bins, class_agnostic=False)
+        for sample in samples:
+            extractor.update(sample)
+        feature = extractor.aggregate()
+
+        class_ids = sorted(extractor.class_names.keys())
+        expected = {}
+        for sample in samples:
+            iou = box_iou(torch.from_numpy(sample.bboxes_xyxy), torch.from_numpy(sample.bboxes_xyxy)).numpy()
+            for i, j in zip(*np.nonzero(iou)):
+                if i != j and sample.class_ids[i] == sample.class_ids[j] and iou[i, j] < 1:
+                    counts = expected.setdefault(sample.split, np.zeros((len(class_ids), num_bins)))
+                    counts[class_ids.index(sample.class_ids[i]), : np.digitize(iou[i, j], np.linspace(0, 1, num_bins + 1))] += 1
+
+        self.assertEqual(set(feature.json.keys()), set(expected.keys()))
+        for split, counts in expected.items():
+            np.testing.assert_array_equal(np.array(feature.json[split]), counts)
+
 
 if __name__ == "__main__":
     unittest.main()
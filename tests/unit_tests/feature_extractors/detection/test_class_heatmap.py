@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from data_gradients.feature_extractors import DetectionClassHeatmap
+from data_gradients.utils.data_classes.data_samples import DetectionSample, Image
+from data_gradients.utils.data_classes.image_channels import ImageChannels
+from data_gradients.dataset_adapters.formatters.utils import Uint8ImageFormat
+from data_gradients.utils.detection import scale_bboxes
+
+
+class DetectionClassHeatmapTest(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(seed=0)
+        self.class_names = {i: f"class_{i}" for i in range(1000)}
+        self.samples = []
+        for i in range(20):
+            num_boxes = int(rng.integers(0, 15))
+            height, width = int(rng.integers(50, 300)), int(rng.integers(50, 300))
+            bboxes_xyxy = rng.uniform(-10, 320, size=(num_boxes, 4))
+            bboxes_xyxy[:, 2:] = bboxes_xyxy[:, :2] + rng.uniform(0, 100, size=(num_boxes, 2))
+            self.samples.append(
+                DetectionSample(
+                    sample_id=str(i),
+                    split="train" if i % 3 else "val",
+                    image=Image(data=np.zeros((height, width, 3), dtype=np.uint8), format=Uint8ImageFormat(), channels=ImageChannels.from_str("RGB")),
+                    bboxes_xyxy=bboxes_xyxy,
+                    class_ids=rng.choice([3, 17, 512, 999], size=num_boxes),
+                    class_names=self.class_names,
+                )
+            )
+
+    def _expected_heatmaps(self, heatmap_shape):
+        """Reference implementation, painting each box on a dense heatmap."""
+        heatmaps = {}
+        for sample in self.samples:
+            split_heatmap = heatmaps.setdefault(sample.split, np.zeros((len(self.class_names), *heatmap_shape)))
+            bboxes_xyxy = scale_bboxes(old_shape=sample.image.shape[:2], new_shape=heatmap_shape, bboxes_xyxy=sample.bboxes_xyxy)
+            for class_id, (x1, y1, x2, y2) in zip(sample.class_ids, bboxes_xyxy):
+                x1, y1, x2, y2 = (max(int(v), 0) for v in (x1, y1, x2, y2))
+                split_heatmap[class_id, y1:y2, x1:x2] += 1
+        return heatmaps
+
+    def test_heatmaps_match_dense_accumulation(self):
+        heatmap_shape = (60, 80)
+        extractor = DetectionClassHeatmap(heatmap_shape=heatmap_shape)
+        for sample in self.samples:
+            extractor.update(sample)
+
+        expected = self._expected_heatmaps(heatmap_shape)
+        heatmaps_per_split = extractor.get_heatmaps_per_split()
+        self.assertEqual(heatmaps_per_split.keys(), expected.keys())
+        for split, heatmaps in heatmaps_per_split.items():
+            # Only the classes that appear are stored
+            self.assertEqual(list(heatmaps.keys()), [class_id for class_id in self.class_names if expected[split][class_id].any()])
+            for class_id, heatmap in heatmaps.items():
+                self.assertEqual(heatmap.dtype, np.uint32)
+                np.testing.assert_array_equal(heatmap, expected[split][class_id])
+
+        self.assertEqual(len(extractor.aggregate().json), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
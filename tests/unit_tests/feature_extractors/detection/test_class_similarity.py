@@ -0,0 +1,74 @@
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+
+from data_gradients.feature_extractors import DetectionClassSimilarity
+from data_gradients.utils.data_classes.data_samples import DetectionSample, Image
+from data_gradients.utils.data_classes.image_channels import ImageChannels
+from data_gradients.dataset_adapters.formatters.utils import Uint8ImageFormat
+
+
+class ClassSimilarityTest(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(seed=0)
+        class_names = {0: "cat", 1: "dog", 2: "bird"}
+        self.samples = []
+        for i in range(6):
+            num_boxes = 4
+            bboxes_xyxy = np.stack([np.arange(num_boxes) * 16, np.zeros(num_boxes), np.arange(num_boxes) * 16 + 12, np.full(num_boxes, 40)], axis=1)
+            self.samples.append(
+                DetectionSample(
+                    sample_id=str(i),
+                    split="train",
+                    image=Image(
+                        data=rng.integers(0, 255, size=(64, 64, 3), dtype=np.uint8), format=Uint8ImageFormat(), channels=ImageChannels.from_str("RGB")
+                    ),
+                    bboxes_xyxy=bboxes_xyxy,
+                    class_ids=rng.integers(0, 3, size=num_boxes),
+                    class_names=class_names,
+                )
+            )
+
+    def _run(self, **kwargs) -> DetectionClassSimilarity:
+        torch.manual_seed(0)  # The backbone has random weights, and is instantiated lazily when the first batch is embedded.
+        extractor = DetectionClassSimilarity(backbone="mobilenet_v3_small", weights=None, **kwargs)
+        for sample in self.samples:
+            extractor.update(sample)
+        return extractor
+
+    def test_batch_size_does_not_change_result(self):
+        unbatched = self._run(batch_size=1).aggregate().data["All data"]
+        batched = self._run(batch_size=7).aggregate().data["All data"]
+        np.testing.assert_allclose(unbatched, batched, atol=1e-4)
+
+    def test_cached_embeddings_are_reused(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first_run = self._run(batch_size=5, cache_dir=cache_dir)
+            expected = first_run.aggregate().data["All data"]
+
+            second_run = DetectionClassSimilarity(backbone="mobilenet_v3_small", weights=None, batch_size=5, cache_dir=cache_dir)
+            for sample in self.samples:
+                second_run.update(sample)
+            result = second_run.aggregate().data["All data"]
+
+        self.assertIsNone(second_run.embedder._model)  # All the crops were found in the cache, so the backbone was never needed.
+        np.testing.assert_allclose(expected, result, atol=1e-5)
+
+    def test_merge_shards(self):
+        expected = self._run(batch_size=4).aggregate()
+
+        torch.manual_seed(0)
+        shards = [DetectionClassSimilarity(backbone="mobilenet_v3_small", weights=None, batch_size=4) for _ in range(2)]
+        shards[1].embedder._model = shards[0].embedder.model  # Both shards need to use the same (random) weights.
+        for i, sample in enumerate(self.samples):
+            shards[i % 2].update(sample)
+        merged = shards[0].merge(shards[1]).aggregate()
+
+        np.testing.assert_allclose(expected.data["All data"], merged.data["All data"], atol=1e-5)
+        self.assertEqual(expected.plot_options.yticklabels, merged.plot_options.yticklabels)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import pickle
+import unittest
+
+import numpy as np
+
+from data_gradients.feature_extractors import (
+    SummaryStats,
+    ImagesResolution,
+    ImageColorDistribution,
+    DetectionClassFrequency,
+    DetectionClassHeatmap,
+    DetectionBoundingBoxIoU,
+)
+from data_gradients.utils.data_classes.data_samples import DetectionSample, Image
+from data_gradients.utils.data_classes.image_channels import ImageChannels
+from data_gradients.dataset_adapters.formatters.utils import Uint8ImageFormat
+
+
+class MergeableStateTest(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(seed=42)
+        class_names = {i: f"class_{i}" for i in range(5)}
+        self.samples = []
+        for i in range(30):
+            num_boxes = int(rng.integers(1, 8))
+            bboxes_xyxy = rng.integers(0, 80, size=(num_boxes, 4))
+            bboxes_xyxy[:, 2:] += bboxes_xyxy[:, :2] + 1
+            self.samples.append(
+                DetectionSample(
+                    sample_id=str(i),
+                    split="train" if i % 4 else "val",
+                    image=Image(
+                        data=rng.integers(0, 255, size=(int(rng.integers(100, 200)), 160, 3), dtype=np.uint8),
+                        format=Uint8ImageFormat(),
+                        channels=ImageChannels.from_str("RGB"),
+                    ),
+                    bboxes_xyxy=bboxes_xyxy,
+                    class_ids=rng.integers(0, 5, size=num_boxes),
+                    class_names=class_names,
+                )
+            )
+
+    def _run_single_and_merged(self, feature_extractor_class):
+        single_run = feature_extractor_class()
+        for sample in self.samples:
+            single_run.update(sample)
+
+        shards = [feature_extractor_class() for _ in range(3)]
+        for shard_index, shard in enumerate(shards):
+            for sample in self.samples[shard_index * 10 : (shard_index + 1) * 10]:
+                shard.update(sample)
+
+        # States are sent between processes, so make sure they survive pickling.
+        merged = feature_extractor_class.from_state(pickle.loads(pickle.dumps(shards[0].state_dict())))
+        for shard in shards[1:]:
+            merged.merge(shard)
+        return single_run, merged
+
+    def _assert_merge_equals_single_run(self, feature_extractor_class):
+        single_run, merged = self._run_single_and_merged(feature_extractor_class)
+        self.assertEqual(single_run.aggregate().json, merged.aggregate().json)
+        return single_run, merged
+
+    def test_merge_records(self):
+        for feature_extractor_class in (ImagesResolution, DetectionClassFrequency, DetectionBoundingBoxIoU):
+            self._assert_merge_equals_single_run(feature_extractor_class)
+
+    def test_merge_summary_stats(self):
+        self._assert_merge_equals_single_run(SummaryStats)
+
+    def test_merge_color_distribution(self):
+        self._assert_merge_equals_single_run(ImageColorDistribution)
+
+    def test_merge_heatmap(self):
+        single_run, merged = self._assert_merge_equals_single_run(DetectionClassHeatmap)
+        single_run_heatmaps, merged_heatmaps = single_run.get_heatmaps_per_split(), merged.get_heatmaps_per_split()
+        self.assertEqual(single_run_heatmaps.keys(), merged_heatmaps.keys())
+        for split, heatmaps in single_run_heatmaps.items():
+            self.assertEqual(heatmaps.keys(), merged_heatmaps[split].keys())
+            for class_id, heatmap in heatmaps.items():
+                np.testing.assert_array_equal(heatmap, merged_heatmaps[split][class_id])
+
+    def test_merge_different_types(self):
+        with self.assertRaises(TypeError):
+            ImagesResolution().merge(DetectionClassFrequency())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from data_gradients.feature_extractors import SegmentationClassHeatmap
+from data_gradients.utils.data_classes.data_samples import SegmentationSample, Image
+from data_gradients.utils.data_classes.image_channels import ImageChannels
+from data_gradients.dataset_adapters.formatters.utils import Uint8ImageFormat
+from data_gradients.utils.image_processing import resize_categorical_mask
+
+
+def _make_sample(split: str, mask: np.ndarray, class_names: dict) -> SegmentationSample:
+    image = Image(data=np.zeros((*mask.shape, 3), dtype=np.uint8), format=Uint8ImageFormat(), channels=ImageChannels.from_str("RGB"))
+    return SegmentationSample(sample_id=None, split=split, image=image, mask=mask, contours=None, class_names=class_names)
+
+
+class SegmentationClassHeatmapTest(unittest.TestCase):
+    def test_resize_categorical_mask_matches_cv2_nearest(self):
+        mask = np.random.default_rng(seed=0).integers(0, 30, size=(97, 131), dtype=np.uint8)
+        for shape in [(20, 30), (97, 131), (200, 250)]:
+            expected = cv2.resize(mask, dsize=(shape[1], shape[0]), interpolation=cv2.INTER_NEAREST_EXACT)
+            np.testing.assert_array_equal(resize_categorical_mask(mask, shape=shape), expected)
+        self.assertEqual(resize_categorical_mask(mask.astype(np.int64), shape=(20, 30)).dtype, np.int64)
+
+    def test_heatmap_counts_per_class(self):
+        class_names = {0: "background", 1: "car", 2: "person"}
+        mask = np.zeros((400, 400), dtype=np.uint8)
+        mask[:200, :200] = 1
+        mask[300:, 300:] = 2
+        mask[390:, :10] = 255  # Ignore label
+
+        extractor = SegmentationClassHeatmap(heatmap_shape=(40, 40))
+        extractor.update(_make_sample("train", mask, class_names))
+        extractor.update(_make_sample("train", mask, class_names))
+        extractor.update(_make_sample("val", mask[:, ::-1].copy(), class_names))
+
+        train_heatmap = extractor.heatmaps_per_split["train"]
+        self.assertEqual(train_heatmap.shape, (3, 40, 40))
+        self.assertTrue(np.all(train_heatmap[1, :20, :20] == 2))
+        self.assertEqual(train_heatmap[1].sum(), 2 * 20 * 20)
+        self.assertEqual(train_heatmap[2].sum(), 2 * 10 * 10)  # The last class is counted as well
+        self.assertEqual(train_heatmap.sum(), 2 * (40 * 40 - 1))  # Only the pixels with a known class are counted
+        np.testing.assert_array_equal(extractor.heatmaps_per_split["val"][1], train_heatmap[1][:, ::-1] / 2)
+
+        self.assertEqual(set(extractor.aggregate().json.keys()), {"background", "car", "person"})
+
+
+if __name__ == "__main__":
+    unittest.main()
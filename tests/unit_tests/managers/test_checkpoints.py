@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+
+import torch
+from torch.utils.data import DataLoader
+
+from data_gradients.managers.classification_manager import ClassificationAnalysisManager
+from data_gradients.utils.data_classes.image_channels import ImageChannels
+from data_gradients.dataset_adapters.formatters.utils import Uint8ImageFormat
+
+
+class _FailingDataset:
+    """Map-style dataset raising an error when reaching a given index, to simulate a run that gets killed."""
+
+    def __init__(self, samples: list, fail_at: int = None):
+        self.samples = samples
+        self.fail_at = fail_at
+        self.loaded_indices = []
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __getitem__(self, index):
+        if index == self.fail_at:
+            raise RuntimeError("Simulated crash")
+        self.loaded_indices.append(index)
+        return self.samples[index]
+
+
+class CheckpointsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        generator = torch.Generator().manual_seed(0)
+        self.train_samples = [(torch.randint(0, 255, (3, 20 + i, 30), generator=generator).float(), i % 3) for i in range(12)]
+        self.val_samples = [(torch.randint(0, 255, (3, 25, 20 + i), generator=generator).float(), i % 3) for i in range(7)]
+        self.log_dir = tempfile.mkdtemp()
+
+    def _make_manager(self, train_data, val_data, **kwargs) -> ClassificationAnalysisManager:
+        return ClassificationAnalysisManager(
+            report_title="Checkpoints Test",
+            train_data=train_data,
+            val_data=val_data,
+            log_dir=self.log_dir,
+            class_names=["a", "b", "c"],
+            feature_extractors=["SummaryStats", "ImagesResolution", "ClassificationClassFrequency"],
+            is_batch=False,
+            image_channels=ImageChannels.from_str("RGB"),
+            image_format=Uint8ImageFormat(),
+            checkpoint_interval=0,
+            **kwargs,
+        )
+
+    def _get_results(self, manager: ClassificationAnalysisManager) -> list:
+        return [feature_extractor.aggregate().json for feature_extractor in manager.feature_extractors]
+
+    def test_sample_ids_are_stable(self):
+        manager = self._make_manager(train_data=self.train_samples, val_data=self.val_samples)
+        sample_ids = [sample.sample_id for sample in manager.train_samples_iterator]
+        self.assertEqual(sample_ids, [f"train_{i}" for i in range(len(self.train_samples))])
+
+    def test_resume_after_crash(self):
+        expected = self._get_results(self._run_to_completion(self.train_samples, self.val_samples, log_dir=tempfile.mkdtemp()))
+
+        crashing_manager = self._make_manager(train_data=_FailingDataset(self.train_samples, fail_at=8), val_data=self.val_samples)
+        with self.assertRaises(RuntimeError):
+            crashing_manager.execute()
+        self.assertTrue(os.path.exists(crashing_manager.checkpoint_path))
+
+        train_data = _FailingDataset(self.train_samples)
+        resumed_manager = self._make_manager(train_data=train_data, val_data=self.val_samples, resume=True)
+        resumed_manager.execute()
+
+        self.assertEqual(train_data.loaded_indices, list(range(8, len(self.train_samples))))  # Samples analyzed before the crash are not loaded again
+        self.assertEqual(self._get_results(resumed_manager), expected)
+
+    def test_resume_with_dataloader(self):
+        expected = self._get_results(self._run_to_completion(self.train_samples, self.val_samples, log_dir=tempfile.mkdtemp()))
+
+        crashing_manager = self._make_manager(train_data=DataLoader(_FailingDataset(self.train_samples, fail_at=5)), val_data=self.val_samples)
+        with self.assertRaises(RuntimeError):
+            crashing_manager.execute()
+
+        resumed_manager = self._make_manager(train_data=DataLoader(self.train_samples), val_data=self.val_samples, resume=True)
+        resumed_manager.execute()
+        self.assertEqual(self._get_results(resumed_manager), expected)
+
+    def test_resume_with_other_feature_extractors(self):
+        crashing_manager = self._make_manager(train_data=_FailingDataset(self.train_samples, fail_at=3), val_data=self.val_samples)
+        with self.assertRaises(RuntimeError):
+            crashing_manager.execute()
+
+        with self.assertRaises(ValueError):
+            ClassificationAnalysisManager(
+                report_title="Checkpoints Test",
+                train_data=self.train_samples,
+                log_dir=self.log_dir,
+                class_names=["a", "b", "c"],
+                feature_extractors=["ImagesResolution"],
+                resume=True,
+            )
+
+    def _run_to_completion(self, train_data, val_data, log_dir: str) -> ClassificationAnalysisManager:
+        manager = self._make_manager(train_data=train_data, val_data=val_data)
+        manager.checkpoint_path = os.path.join(log_dir, "checkpoint.pkl")
+        manager.execute()
+        return manager
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+
+from data_gradients.utils.data_classes.data_samples import ImageSample, Image
+from data_gradients.feature_extractors.common.image_average_brightness import ImagesAverageBrightness
+from data_gradients.feature_extractors.common.image_color_distribution import ImageColorDistribution
+from data_gradients.feature_extractors.common.image_resolution import ImagesResolution
+from data_gradients.managers.executors import get_executor, SerialExecutor, ThreadExecutor, ProcessExecutor
+from data_gradients.utils.data_classes.image_channels import ImageChannels
+from data_gradients.dataset_adapters.formatters.utils import Uint8ImageFormat
+
+
+class ExecutorsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(seed=0)
+        self.samples = []
+        for i in range(20):
+            height, width = rng.integers(20, 60, size=2)
+            self.samples.append(
+                ImageSample(
+                    sample_id=f"sample_{i}",
+                    split="train" if i % 3 else "val",
+                    image=Image(
+                        data=rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8),
+                        format=Uint8ImageFormat(),
+                        channels=ImageChannels.from_str("RGB"),
+                    ),
+                )
+            )
+
+    def _run(self, executor: str) -> list:
+        feature_extractors = [ImagesAverageBrightness(), ImageColorDistribution(), ImagesResolution()]
+        with get_executor(executor=executor, feature_extractors=feature_extractors, n_workers=2) as executor_instance:
+            for sample in self.samples:
+                executor_instance.submit(sample)
+        return [feature_extractor.aggregate().json for feature_extractor in feature_extractors]
+
+    def test_get_executor(self):
+        self.assertIsInstance(get_executor("serial", feature_extractors=[ImagesResolution()]), SerialExecutor)
+        self.assertIsInstance(get_executor(ThreadExecutor, feature_extractors=[ImagesResolution()]), ThreadExecutor)
+        with self.assertRaises(ValueError):
+            get_executor("gpu", feature_extractors=[ImagesResolution()])
+
+    def test_thread_executor_matches_serial(self):
+        self.assertEqual(self._run("serial"), self._run("thread"))
+
+    def test_process_executor_matches_serial(self):
+        self.assertIsInstance(get_executor("process", feature_extractors=[]), ProcessExecutor)
+        self.assertEqual(self._run("serial"), self._run("process"))
+
+    def test_thread_executor_raises_update_error(self):
+        feature_extractor = ImagesResolution()
+        with self.assertRaises(AttributeError):
+            with ThreadExecutor(feature_extractors=[feature_extractor]) as executor:
+                executor.submit(None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import pickle
+import unittest
+
+import cv2
+import numpy as np
+
+from data_gradients.sample_preprocessor.utils.contours import get_contours
+from data_gradients.utils.data_classes.contour import Contour, ContourSet
+
+
+class TestContours(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(seed=0)
+        self.mask = np.zeros((120, 160), dtype=np.uint8)
+        for _ in range(40):
+            class_id, x, y = int(rng.integers(1, 20)), int(rng.integers(-10, 160)), int(rng.integers(-10, 120))
+            self.mask[max(y, 0) : y + int(rng.integers(2, 40)), max(x, 0) : x + int(rng.integers(2, 40))] = class_id
+            cv2.circle(self.mask, (x, y), int(rng.integers(1, 15)), int(rng.integers(1, 20)), -1)
+
+    def test_same_contours_as_full_mask(self):
+        class_ids = list(range(0, 25))
+        contours = get_contours(self.mask, class_ids=class_ids)
+
+        expected_classes = [class_id for class_id in class_ids if np.any(self.mask == class_id)]
+        found_classes, _ = contours.count_per_class()
+        self.assertTrue(set(found_classes.tolist()).issubset(expected_classes))
+        self.assertEqual(found_classes.tolist(), sorted(found_classes.tolist()))
+
+        for class_id in found_classes:
+            class_contours = [contour for contour in contours if contour.class_id == class_id]
+            expected_contours, _ = cv2.findContours((self.mask == class_id).astype(np.uint8), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            expected_contours = [contour for contour in expected_contours if cv2.contourArea(contour) > 9]
+
+            self.assertEqual(len(class_contours), len(expected_contours))
+            for contour, expected_points in zip(class_contours, expected_contours):
+                np.testing.assert_array_equal(contour.points, expected_points)
+                self.assertEqual(contour.area, cv2.contourArea(expected_points))
+                self.assertEqual(contour.w, expected_points[:, :, 0].max() - expected_points[:, :, 0].min())
+                self.assertEqual(contour.h, expected_points[:, :, 1].max() - expected_points[:, :, 1].min())
+                self.assertAlmostEqual(contour.perimeter, cv2.arcLength(expected_points, closed=True))
+                (_, _), (w, h), _ = cv2.minAreaRect(expected_points)
+                self.assertAlmostEqual(contour.bbox_area, w * h)
+
+    def test_missing_classes(self):
+        contours = get_contours(np.zeros((10, 10), dtype=np.uint8), class_ids=[1, 2])
+        self.assertEqual(len(contours), 0)
+        self.assertEqual(list(contours), [])
+        self.assertEqual(contours.perimeters.shape, (0,))
+
+
+class TestContourSet(unittest.TestCase):
+    def setUp(self) -> None:
+        mask = np.zeros((60, 80), dtype=np.uint8)
+        mask[5:20, 5:30] = 1
+        mask[40:55, 10:20] = 1
+        cv2.circle(mask, (60, 30), 12, 2, -1)
+        self.contours = get_contours(mask, class_ids=[1, 2])
+
+    def test_columns_match_contours(self):
+        self.assertEqual(len(self.contours), 3)
+        self.assertEqual(self.contours.count_per_class()[0].tolist(), [1, 2])
+        self.assertEqual(self.contours.count_per_class()[1].tolist(), [2, 1])
+
+        for i, contour in enumerate(self.contours):
+            points = contour.points
+            self.assertEqual(points.shape[1:], (1, 2))
+            self.assertEqual(self.contours.areas[i], cv2.contourArea(points))
+            self.assertEqual(self.contours.widths[i], points[..., 0].max() - points[..., 0].min())
+            self.assertEqual(self.contours.heights[i], points[..., 1].max() - points[..., 1].min())
+            self.assertAlmostEqual(self.contours.perimeters[i], cv2.arcLength(points, closed=True))
+            self.assertAlmostEqual(self.contours.convex_hull_perimeters[i], cv2.arcLength(cv2.convexHull(points), closed=True))
+            self.assertAlmostEqual(self.contours.bbox_areas[i], np.prod(cv2.minAreaRect(points)[1]))
+            self.assertEqual(tuple(self.contours.centers[i]), contour.center)
+
+    def test_round_trip(self):
+        contours = [Contour(points=self.contours.get_points(i).copy(), class_id=int(self.contours.class_ids[i])) for i in range(len(self.contours))]
+        rebuilt = ContourSet.from_contours(contours)
+        np.testing.assert_array_equal(rebuilt.points, self.contours.points)
+        np.testing.assert_array_equal(rebuilt.offsets, self.contours.offsets)
+        np.testing.assert_array_equal(rebuilt.areas, self.contours.areas)
+        self.assertEqual(self.contours[-1].class_id, 2)
+        with self.assertRaises(IndexError):
+            _ = self.contours[3]
+
+    def test_lazy_properties_are_cached_and_pickled(self):
+        self.assertNotIn("perimeters", self.contours.__dict__)
+        perimeters = self.contours.perimeters
+        self.assertIs(self.contours.perimeters, perimeters)
+
+        unpickled = pickle.loads(pickle.dumps(self.contours))
+        np.testing.assert_array_equal(unpickled.perimeters, perimeters)
+        np.testing.assert_array_equal(unpickled.points, self.contours.points)
+
+
+if __name__ == "__main__":
+    unittest.main()